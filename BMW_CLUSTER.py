@@ -11,79 +11,159 @@ Description:
     RPM, speed, engine temperature, handbrake, seatbelt, indicator lights,
     time/date, and dashboard lighting.
 
-    The script runs in a timed loop, executing different signal functions based
-    on a cyclic counter to simulate real-time vehicle behavior.
+    The signals sent, their order, rate and arguments come from the active
+    cluster profile (see signal_registry.py and cluster_profiles.json). Only
+    the modules used by that profile are imported.
+
+    The script runs in a timed loop, walking the profile's dispatch table on
+    each cycle to simulate real-time vehicle behavior.
 
 Dependencies:
     - usb_can.py (CANInterface class)
+    - can_counters.py (shared rolling counters / checksums)
+    - signal_registry.py (cluster profiles and signal plugins)
+    - can_bridge.py (gateway mode between CAN1 and CAN2)
+    - socket_can.py (SocketCAN backend, used with --socketcan)
+    - can_echo.py (echo verification, used with --verify)
+    - can_stress.py (fault injection, used with --drop/--bad-dlc/--freeze/--skip)
+    - calibration.py (per-cluster gauge lookup tables)
     - Custom modules in /modules (ignition, lightning, rpm, etc.)
 
 Usage:
     Run this script directly with Python to start the CAN simulation:
         python BMW_CLUSTER.py
+        python BMW_CLUSTER.py --profile e_series_minimal --port /dev/ttyUSB0
+        python BMW_CLUSTER.py --profile-import
+        python BMW_CLUSTER.py --bridge --override 1A6   # carro no CAN1, cluster no CAN2
+        python BMW_CLUSTER.py --socketcan can0          # adaptador SocketCAN (Linux)
+        python BMW_CLUSTER.py --verify 2                # confere os frames recebidos no CAN2
+        python BMW_CLUSTER.py --calibration example_nonlinear
+        python BMW_CLUSTER.py --drop 1A6:10 --bad-dlc 0C0:3 --freeze 19E --skip 0D7:2
 """
 
+import argparse
+
 from usb_can import CANInterface
-from modules.ignition import send_ignition
-from modules.lightning import send_lightning
-from modules.rpm import send_rpm
-from modules.speed import send_speed
-from modules.abs import send_abs
-from modules.airbag import send_airbag
-from modules.enginetemperature import send_engine_temperature
-from modules.fuel import send_fuel
-from modules.handbrake import send_handbrake
-from modules.seatbelt import send_seatbelt
-from modules.indicators import IndicatorController
-from modules.time import send_time
+from calibration import CALIBRATION, DEFAULT_MODEL
+from can_counters import COUNTERS
+from can_bridge import CAN_EFF_FLAG, CANBridge
+from can_echo import EchoVerifier
+from can_stress import FaultInjector
+from signal_registry import DEFAULT_CONFIG, build_dispatch, load_config, print_import_report
 import time
 
+def _parse_bridge_id(value):
+    # Mesma regra do send_message: mais de 3 dígitos = ID de 29 bits
+    can_id = int(value, 16)
+    return can_id | CAN_EFF_FLAG if len(value) > 3 else can_id
+
+def _parse_fault(value):
+    # ID:N - ID em hex, N em decimal (>= 1)
+    can_id, _, count = value.partition(":")
+    count = int(count)
+    if count < 1:
+        raise ValueError(count)
+    return int(can_id, 16), count
+
+def _parse_bad_dlc(value):
+    # ID:DLC - ambos em hex (DLC 0-F)
+    can_id, _, dlc = value.partition(":")
+    dlc = int(dlc, 16)
+    if not 0 <= dlc <= 0xF:
+        raise ValueError(dlc)
+    return int(can_id, 16), dlc
+
 def main():
-    can = CANInterface(port="COM3")
+    parser = argparse.ArgumentParser(description="Simulação de cluster BMW via CAN.")
+    parser.add_argument("--port", default="COM3", help="Porta serial do adaptador")
+    parser.add_argument("--profile", default="e_series", help="Perfil de cluster ativo")
+    parser.add_argument("--config", default=DEFAULT_CONFIG, help="Arquivo de sinais e perfis")
+    parser.add_argument("--profile-import", action="store_true",
+                        help="Mostra o tempo de importação de cada módulo de sinal")
+    parser.add_argument("--bridge", action="store_true",
+                        help="Repassa CAN1 (carro) -> CAN2 (cluster); o emulador envia só os IDs em --override")
+    parser.add_argument("--override", action="append", default=[], type=_parse_bridge_id,
+                        metavar="ID", help="ID em hex substituído pelo emulador no modo bridge "
+                                           "(8 dígitos = 29 bits)")
+    parser.add_argument("--socketcan", default=None, metavar="IFACE[,IFACE2]",
+                        help="Usa SocketCAN (ex: can0 ou can0,can1) no lugar do adaptador serial")
+    parser.add_argument("--verify", nargs="?", const=0, default=None, type=int, metavar="CHANNEL",
+                        help="Confere a entrega dos frames pelo eco do adaptador ou pelo canal indicado")
+    parser.add_argument("--calibration", default=None, metavar="MODEL",
+                        help="Tabela de calibração dos ponteiros (padrão: a do perfil)")
+    parser.add_argument("--drop", action="append", default=[], type=_parse_fault, metavar="ID:N",
+                        help="Descarta um a cada N frames do ID (1 descarta todos)")
+    parser.add_argument("--bad-dlc", action="append", default=[], type=_parse_bad_dlc, metavar="ID:DLC",
+                        help="Envia os frames do ID com o DLC indicado (hex)")
+    parser.add_argument("--freeze", action="append", default=[], type=lambda v: int(v, 16), metavar="ID",
+                        help="Congela os contadores rolantes do ID")
+    parser.add_argument("--skip", action="append", default=[], type=_parse_fault, metavar="ID:N",
+                        help="Pula N valores do contador rolante do ID a cada envio")
+    args = parser.parse_args()
+
+    if args.socketcan and args.bridge:
+        parser.error("--bridge usa o adaptador serial e não funciona com --socketcan")
+    if args.bridge and args.verify is not None:
+        parser.error("--bridge e --verify leem o mesmo fluxo de recepção; use apenas um")
+    if args.verify not in (None, 0, 1, 2):
+        parser.error("--verify aceita apenas o canal 1 ou 2")
+    if args.socketcan and args.verify == 2 and len(args.socketcan.split(",")) < 2:
+        parser.error("--verify 2 com --socketcan precisa de duas interfaces (ex: can0,can1)")
+
+    config = load_config(args.config)
+    dispatch, import_times = build_dispatch(config, args.profile)
+    CALIBRATION.load(args.calibration or config["profiles"][args.profile].get("calibration", DEFAULT_MODEL))
+    if args.profile_import:
+        print_import_report(import_times)
+
+    if args.socketcan:
+        from socket_can import SocketCANInterface
+        interfaces = dict(enumerate(args.socketcan.split(","), start=1))
+        # Eco no canal de envio (CAN1): o próprio socket precisa receber os frames que envia
+        can = SocketCANInterface(interfaces=interfaces, recv_own_msgs=args.verify in (0, 1))
+    else:
+        can = CANInterface(port=args.port)
     can.setup_channel(channel=1, baudrate=100)
 
-    indicators = IndicatorController()
+    # As falhas ficam logo acima da interface: frames descartados pelo injetor
+    # contam como perdidos no --verify, e no --bridge só os IDs em --override
+    # (enviados pelo emulador) são afetados
+    faults = None
+    out = can
+    if args.drop or args.bad_dlc or args.freeze or args.skip:
+        faults = out = FaultInjector(can, drop=dict(args.drop), bad_dlc=dict(args.bad_dlc),
+                                     freeze=args.freeze, skip=dict(args.skip))
+
+    bridge = None
+    if args.bridge:
+        can.setup_channel(channel=2, baudrate=100)
+        bridge = out = CANBridge(out, source=1, destination=2, override=args.override)
+
+    verifier = None
+    if args.verify is not None:
+        if args.verify == 2:
+            can.setup_channel(channel=2, baudrate=100)
+        verifier = out = EchoVerifier(out, echo_channel=args.verify or None)
 
     previous = 0        # Inicializa o timer
     counter = 0         # Contador para ciclos
-    current_speed = 0   # Velocidade inicial
-    step = 1            # Incremento da velocidade
 
     try:
         while True:
+            if bridge is not None:
+                bridge.poll()
+            if verifier is not None:
+                verifier.poll()
+
             current = time.time() * 1000  # tempo atual em ms
 
             if current - previous >= 10:
-                send_ignition(can, ignition_on=True)  # Sempre ligado
-                send_lightning(can, g_lights_main=True,)
-                
-                send_rpm(can, 4000)  # Valor fixo para teste
-                
-                if counter % 7 == 0:
-                    send_speed(can, current_speed)
-                    current_speed += step
-                    if current_speed >= 280 or current_speed <= 0:
-                        step *= -1
-                
-                if counter % 20 == 0:
-                    send_abs(can, abs_enabled=False)
-                    send_airbag(can, airbag_enabled=False)
-                    send_engine_temperature(can, temp_celsius=100)
-                    send_fuel(can, fuel_percent=50)
-                    send_handbrake(can, handbrake_active=True)
-                    send_seatbelt(can, seatbelt_fastened=False)
-                    indicators.send_indicators(can, indicator_state=3)
-                
-                if counter % 100 == 0:
-                    send_time(
-                        can,
-                        hour=14,
-                        minute=35,
-                        second=12,
-                        day=21,
-                        month=6,
-                        year=2025
-                    )
+                for every, send in dispatch:
+                    if counter % every == 0:
+                        send(out)
+
+                # Avança os contadores rolantes de todas as mensagens enviadas
+                COUNTERS.tick()
 
                 counter += 1
                 previous = current
@@ -91,6 +171,13 @@ def main():
 
     except Exception as e:
         print(f"Error: {e}")
+    finally:
+        if faults is not None:
+            faults.release()
+        if bridge is not None:
+            bridge.print_report()
+        if verifier is not None:
+            verifier.print_report()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,259 @@
+"""
+calibration.py
+
+Author: Leeo Santos
+Created: October 2026
+GitHub: https://github.com/c4pt4inroot
+
+Description:
+    Per-cluster calibration of the gauge signals (RPM, fuel, engine
+    temperature).
+
+    Each cluster model has breakpoint tables (input value -> raw value sent
+    on the bus) in calibrations.json. Each table is interpolated once, the
+    first time a signal module uses it, into a dense lookup array:
+    - RPM: one entry per RPM, 0 to 8000
+    - fuel: one entry per 0.1 %, 0 to 100 %
+    - engine temperature: one entry per degree, -48 to 207 °C
+
+    The signal modules then only index these arrays, so encoding stays O(1)
+    in the hot path. Importing this module reads and compiles nothing:
+    load() only reads the breakpoints, and a profile that never sends fuel
+    or temperature never compiles those tables. If no model was loaded, the
+    "linear" model, which reproduces the original fixed mapping, is used.
+
+    Running this file steps a gauge through the breakpoints of a table and
+    measures, for each step, how long the needle takes to settle (press
+    Enter when it stops), or only holds each step for a fixed time.
+
+Usage:
+    from calibration import CALIBRATION
+
+    CALIBRATION.load("example_nonlinear")
+    rpm_byte = CALIBRATION.rpm[3000]
+
+    Sweep:
+        python calibration.py --port COM3 --model linear --gauge fuel
+        python calibration.py --port COM3 --model linear --gauge rpm --steps 8 --dwell 2
+"""
+
+from array import array
+import argparse
+import json
+import os
+import threading
+import time
+
+DEFAULT_CALIBRATIONS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "calibrations.json")
+
+RPM_MAX = 8000
+FUEL_STEPS = 1000           # 0.1 % por entrada
+TEMP_MIN = -48
+TEMP_MAX = 207
+
+DEFAULT_MODEL = "linear"
+
+# Tabela -> (entrada do índice 0, entradas, entradas por unidade, tipo do array)
+TABLES = {
+    "rpm": (0, RPM_MAX + 1, 1, "B"),
+    "fuel": (0, FUEL_STEPS + 1, FUEL_STEPS // 100, "H"),
+    "engine_temperature": (TEMP_MIN, TEMP_MAX - TEMP_MIN + 1, 1, "B"),
+}
+
+def compile_table(breakpoints, start, count, per_unit, typecode):
+    """
+    Interpola uma tabela de pontos em um array denso.
+
+    Fora dos pontos extremos o valor é mantido constante.
+
+    Args:
+        breakpoints (list[list[float]]): Pares [entrada, saída] em ordem crescente de entrada.
+        start (float): Entrada correspondente ao índice 0.
+        count (int): Quantidade de entradas.
+        per_unit (int): Entradas por unidade de entrada (10 = passo de 0,1).
+        typecode (str): Tipo do array ('B', 'H', ...).
+
+    Retorna:
+        array: Valores de saída (truncados para inteiro) por índice.
+    """
+    points = sorted((float(x), float(y)) for x, y in breakpoints)
+    if len(points) < 2:
+        raise ValueError("Tabela de calibração precisa de pelo menos 2 pontos")
+
+    table = array(typecode)
+    segment = 0
+    for i in range(count):
+        x = start + i / per_unit
+        while segment < len(points) - 2 and x > points[segment + 1][0]:
+            segment += 1
+        (x0, y0), (x1, y1) = points[segment], points[segment + 1]
+
+        if x <= x0:
+            y = y0
+        elif x >= x1:
+            y = y1
+        else:
+            y = y0 + (x - x0) * (y1 - y0) / (x1 - x0)
+        table.append(int(y))
+    return table
+
+class Calibration:
+    def __init__(self, path=DEFAULT_CALIBRATIONS, model=None):
+        """
+        Args:
+            path (str): Arquivo JSON com as tabelas por modelo.
+            model (str | None): Modelo carregado inicialmente; None adia a leitura
+                até load() ou o primeiro uso de uma tabela.
+        """
+        self.path = path
+        self.model = None
+        self.breakpoints = {}
+        if model is not None:
+            self.load(model)
+
+    def load(self, model, path=None):
+        """
+        Lê os pontos de um modelo de cluster; cada tabela é compilada no primeiro uso.
+
+        Args:
+            model (str): Nome do modelo em calibrations.json.
+            path (str | None): Outro arquivo de calibração.
+        """
+        if path is not None:
+            self.path = path
+        with open(self.path, "r", encoding="utf-8") as f:
+            models = json.load(f)
+        if model not in models:
+            raise ValueError(f"Calibração desconhecida: {model}")
+
+        tables = models[model]
+        for name in TABLES:
+            if len(tables.get(name, ())) < 2:
+                raise ValueError(f"Calibração '{model}': tabela '{name}' precisa de pelo menos 2 pontos")
+
+        self.breakpoints = {name: tables[name] for name in TABLES}
+        self.model = model
+        # Descarta as tabelas compiladas do modelo anterior
+        for name in TABLES:
+            self.__dict__.pop(name, None)
+
+    def __getattr__(self, name):
+        # Só é chamado enquanto a tabela ainda não foi compilada; depois ela
+        # vira um atributo comum e o acesso nos módulos não passa mais por aqui
+        if name not in TABLES:
+            raise AttributeError(name)
+        if self.model is None:
+            self.load(DEFAULT_MODEL)
+        table = compile_table(self.breakpoints[name], *TABLES[name])
+        setattr(self, name, table)
+        return table
+
+    def raw_value(self, gauge, value):
+        """
+        Retorna o valor bruto enviado para uma entrada, pelas mesmas tabelas dos módulos.
+
+        Args:
+            gauge (str): 'rpm', 'fuel' ou 'engine_temperature'.
+            value (float): Entrada (rpm, % ou °C).
+        """
+        if gauge == "rpm":
+            return self.rpm[max(0, min(int(value), RPM_MAX))]
+        if gauge == "fuel":
+            return self.fuel[int(round(max(0, min(value, 100)) * FUEL_STEPS / 100))]
+        return self.engine_temperature[max(TEMP_MIN, min(int(value), TEMP_MAX)) - TEMP_MIN]
+
+# Calibração ativa, compartilhada pelos módulos de sinal
+CALIBRATION = Calibration()
+
+GAUGES = {
+    "rpm": ("modules.rpm", "send_rpm"),
+    "fuel": ("modules.fuel", "send_fuel"),
+    "engine_temperature": ("modules.enginetemperature", "send_engine_temperature"),
+}
+
+def _sender(can, send, value, stop):
+    from can_counters import COUNTERS
+    from modules.ignition import send_ignition
+
+    # Mantém o cluster acordado e o valor sendo enviado a cada 10 ms
+    while not stop.is_set():
+        send_ignition(can, ignition_on=True)
+        send(can, value[0])
+        COUNTERS.tick()
+        time.sleep(0.01)
+
+def sweep(can, gauge, dwell=None, steps=None):
+    """
+    Passa o ponteiro por todos os pontos da tabela ativa.
+
+    Args:
+        can (CANInterface): Interface CAN configurada.
+        gauge (str): 'rpm', 'fuel' ou 'engine_temperature'.
+        dwell (float | None): Tempo fixo por ponto; None mede até o usuário apertar Enter.
+        steps (int | None): Passos iguais entre o primeiro e o último ponto, no lugar
+            dos pontos da tabela.
+
+    Retorna:
+        list[tuple[float, float]]: (valor de entrada, segundos até estabilizar) por ponto.
+    """
+    import importlib
+
+    module_name, function_name = GAUGES[gauge]
+    send = getattr(importlib.import_module(module_name), function_name)
+
+    if CALIBRATION.model is None:
+        CALIBRATION.load(DEFAULT_MODEL)
+
+    points = [x for x, _ in CALIBRATION.breakpoints[gauge]]
+    if steps:
+        first, last = points[0], points[-1]
+        points = [first + (last - first) * n / steps for n in range(steps + 1)]
+
+    value = [points[0]]
+    stop = threading.Event()
+    thread = threading.Thread(target=_sender, args=(can, send, value, stop), daemon=True)
+    thread.start()
+
+    results = []
+    try:
+        for x in points:
+            value[0] = x
+            raw = CALIBRATION.raw_value(gauge, x)
+            start = time.perf_counter()
+            if dwell is None:
+                input(f"{gauge} = {x} (bruto {raw}): Enter quando o ponteiro parar... ")
+            else:
+                print(f"{gauge} = {x} (bruto {raw})")
+                time.sleep(dwell)
+            results.append((x, time.perf_counter() - start))
+    finally:
+        stop.set()
+        thread.join()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Varredura dos ponteiros pela tabela de calibração.")
+    parser.add_argument("--port", default="COM3")
+    parser.add_argument("--baudrate", type=int, default=100, help="Baudrate CAN em kbps")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--calibrations", default=DEFAULT_CALIBRATIONS)
+    parser.add_argument("--gauge", choices=sorted(GAUGES), default="rpm")
+    parser.add_argument("--steps", type=int, default=None, help="Passos iguais no lugar dos pontos da tabela")
+    parser.add_argument("--dwell", type=float, default=None, help="Segundos por ponto (sem medição)")
+    args = parser.parse_args()
+
+    CALIBRATION.load(args.model, path=args.calibrations)
+
+    from usb_can import CANInterface
+
+    can = CANInterface(port=args.port)
+    can.setup_channel(channel=1, baudrate=args.baudrate)
+
+    results = sweep(can, args.gauge, dwell=args.dwell, steps=args.steps)
+    if args.dwell is None:
+        print(f"Convergência ({args.gauge}, {args.model}):")
+        for x, elapsed in results:
+            print(f"  {x:8g}: {elapsed:.2f} s")
+
+if __name__ == "__main__":
+    main()
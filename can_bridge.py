@@ -0,0 +1,311 @@
+"""
+can_bridge.py
+
+Author: Leeo Santos
+Created: October 2026
+GitHub: https://github.com/c4pt4inroot
+
+Description:
+    Gateway/bridge mode: relays frames between the two CAN channels of the
+    adapter, e.g. a real car on one side and the cluster on the other.
+
+    Every pending line is read at once (CANInterface.read_lines) and each
+    frame goes through an ID filter: a 2048-entry bitset for 11-bit IDs and
+    a dict for 29-bit IDs. Frames without a rewrite rule are forwarded as
+    they arrived, only the channel digit changes, so there is no hex
+    decoding or re-encoding on the common path.
+
+    IDs passed to allow/block/override/rewrite are 11-bit when below 0x800;
+    a 29-bit ID in that range is marked with CAN_EFF_FLAG (e.g.
+    0x123 | CAN_EFF_FLAG), the same convention as SocketCAN.
+
+    Lines that are not valid frames (serial noise, truncated lines, IDs out
+    of range) are counted as malformed and skipped, like receive_message does.
+
+    Rewrite rules are set per ID, either as {byte_index: value} or as a
+    function data -> data (returning None drops the frame).
+
+    Overridden IDs are blocked on the real side, and the emulator sends its
+    own frames for them instead. The bridge exposes send_message, so it can
+    be passed directly to the signal modules: their frames go to the output
+    channel, and only those with an overridden ID are sent.
+
+    The host-side latency of each forwarded batch is kept over the last
+    samples and reported as percentiles. It is measured from the end of the
+    previous poll() to after the batch was written back, so it includes the
+    time frames wait in the serial buffer between polls (the main delay in
+    the BMW_CLUSTER.py loop) and is an upper bound for each frame. The
+    parse/write time alone is reported separately as processing time.
+    Time spent on the wire and inside the adapter is not visible from the
+    host and is not included: the adapter timestamp suffix runs on its own
+    clock, not synchronized with the host.
+
+Usage:
+    from usb_can import CANInterface
+    from can_bridge import CANBridge
+    from modules.speed import send_speed
+
+    can = CANInterface(port="COM3")
+    can.setup_channel(channel=1, baudrate=100)
+    can.setup_channel(channel=2, baudrate=100)
+
+    bridge = CANBridge(can, source=1, destination=2, override=[0x1A6])
+    while True:
+        bridge.poll()
+        send_speed(bridge, 50)  # substitui a velocidade real do carro
+"""
+
+from binascii import unhexlify
+from collections import deque
+import time
+
+STANDARD_ID_COUNT = 0x800
+CAN_EFF_FLAG = 0x80000000
+CAN_EFF_MASK = 0x1FFFFFFF
+
+def percentiles(samples, points=(50, 90, 99, 100)):
+    """
+    Args:
+        samples (iterable[float]): Amostras.
+        points (tuple[int]): Percentis desejados.
+
+    Retorna:
+        dict[int, float]: Percentil -> valor (vazio sem amostras).
+    """
+    ordered = sorted(samples)
+    if not ordered:
+        return {}
+    last = len(ordered) - 1
+    return {p: ordered[min(last, int(round(p / 100.0 * last)))] for p in points}
+
+def _filter_key(can_id):
+    # IDs de 29 bits levam CAN_EFF_FLAG, inclusive os abaixo de 0x800
+    if can_id & CAN_EFF_FLAG or can_id >= STANDARD_ID_COUNT:
+        return (can_id & CAN_EFF_MASK) | CAN_EFF_FLAG
+    return can_id
+
+class CANBridge:
+    def __init__(self, can, source=1, destination=2, allow=None, block=(), override=(),
+                 rewrite=None, bidirectional=False, latency_samples=4096):
+        """
+        Args:
+            can (CANInterface): Interface CAN com os dois canais configurados.
+            source (int): Canal de entrada (carro).
+            destination (int): Canal de saída (cluster).
+            allow (iterable[int] | None): IDs repassados; None repassa todos.
+            block (iterable[int]): IDs nunca repassados.
+            override (iterable[int]): IDs cujo frame real é substituído pelo do emulador.
+            rewrite (dict[int, dict | callable] | None): Regras de reescrita por ID.
+                Em todos, IDs de 29 bits abaixo de 0x800 levam CAN_EFF_FLAG.
+            bidirectional (bool): Também repassa destination -> source.
+            latency_samples (int): Quantidade de amostras de latência mantidas
+                (total e só de processamento).
+        """
+        self.can = can
+        self.source = source
+        self.destination = destination
+        self.bidirectional = bidirectional
+
+        # Bitset de IDs de 11 bits e dicionário para IDs de 29 bits
+        self._default = allow is None
+        self._standard = bytearray([1 if self._default else 0]) * STANDARD_ID_COUNT
+        self._extended = {}
+        for can_id in allow or ():
+            self._set_filter(can_id, True)
+        for can_id in block:
+            self._set_filter(can_id, False)
+
+        self._overrides = set()
+        for can_id in override:
+            self.override(can_id)
+
+        self._rules = {}
+        for can_id, rule in (rewrite or {}).items():
+            self.set_rewrite(can_id, rule)
+
+        # Dígito do canal de entrada -> dígito do canal de saída
+        self._out_channel = {ord(str(source)): str(destination).encode()}
+        if bidirectional:
+            self._out_channel[ord(str(destination))] = str(source).encode()
+
+        self.latencies = deque(maxlen=latency_samples)     # desde o fim do poll anterior
+        self.processing = deque(maxlen=latency_samples)    # só leitura, filtro e escrita
+        self._last_poll = None
+        self.stats = {"received": 0, "forwarded": 0, "filtered": 0, "rewritten": 0,
+                      "injected": 0, "malformed": 0}
+
+    def _set_filter(self, can_id, forward):
+        key = _filter_key(can_id)
+        if key & CAN_EFF_FLAG:
+            self._extended[key & CAN_EFF_MASK] = forward
+        else:
+            self._standard[key] = 1 if forward else 0
+
+    def override(self, can_id):
+        """
+        Bloqueia o frame real do ID e libera o envio do frame do emulador.
+
+        Args:
+            can_id (int): ID CAN a substituir (29 bits abaixo de 0x800: com CAN_EFF_FLAG).
+        """
+        self._overrides.add(_filter_key(can_id))
+        self._set_filter(can_id, False)
+
+    def set_rewrite(self, can_id, rule):
+        """
+        Define a regra de reescrita de um ID.
+
+        Args:
+            can_id (int): ID CAN.
+            rule (dict[int, int] | callable): Bytes fixos por índice ou função data -> data.
+        """
+        if isinstance(rule, dict):
+            fixed = dict(rule)
+
+            def rule(data):
+                for index, value in fixed.items():
+                    if index < len(data):
+                        data[index] = value
+                return data
+
+        self._rules[_filter_key(can_id)] = rule
+
+    def poll(self):
+        """
+        Processa todas as linhas pendentes na serial.
+
+        Retorna:
+            int: Frames repassados nesta chamada.
+        """
+        # Frames lidos agora chegaram depois do fim do poll anterior
+        waiting_since = self._last_poll
+        started = time.perf_counter()
+        lines = self.can.read_lines()
+        if not lines:
+            self._last_poll = time.perf_counter()
+            return 0
+
+        standard = self._standard
+        extended = self._extended
+        rules = self._rules
+        out_channel = self._out_channel
+        filtered = rewritten = malformed = 0
+        out = []
+
+        for line in lines:
+            kind = line[:1]
+            if kind == b"t":
+                id_end = 5
+            elif kind == b"T":
+                id_end = 10
+            else:
+                continue
+
+            # Ruído na serial não pode derrubar o loop: a linha é descartada
+            try:
+                can_id = int(line[2:id_end], 16)
+                dlc = int(line[id_end:id_end + 1], 16)
+                data_end = id_end + 1 + min(dlc, 8) * 2
+                if len(line) < data_end:
+                    raise ValueError("frame truncado")
+                payload = unhexlify(line[id_end + 1:data_end])
+                if kind == b"t":
+                    if can_id >= STANDARD_ID_COUNT:
+                        raise ValueError("ID de 11 bits fora da faixa")
+                    forward = standard[can_id]
+                else:
+                    if can_id > CAN_EFF_MASK:
+                        raise ValueError("ID de 29 bits fora da faixa")
+                    forward = extended.get(can_id, self._default)
+                    can_id |= CAN_EFF_FLAG
+            except (ValueError, IndexError):
+                malformed += 1
+                continue
+
+            channel = out_channel.get(line[1])
+            if channel is None:
+                continue
+            if not forward:
+                filtered += 1
+                continue
+
+            rule = rules.get(can_id)
+            if rule is None:
+                # Sem reescrita: troca apenas o canal e descarta o timestamp
+                out.append(kind + channel + line[2:data_end] + b"\r")
+                continue
+
+            data = rule(list(payload))
+            if data is None:
+                filtered += 1
+                continue
+            rewritten += 1
+            out.append(self.can.encode_message(int(channel), line[2:id_end].decode(), data))
+
+        if out:
+            self.can.send_raw(b"".join(out))
+            done = time.perf_counter()
+            self.processing.append(done - started)
+            if waiting_since is not None:
+                self.latencies.append(done - waiting_since)
+
+        self.stats["received"] += len(lines)
+        self.stats["forwarded"] += len(out)
+        self.stats["filtered"] += filtered
+        self.stats["rewritten"] += rewritten
+        self.stats["malformed"] += malformed
+        self._last_poll = time.perf_counter()
+        return len(out)
+
+    def send_message(self, channel, can_id, data):
+        """
+        Envia um frame do emulador para o canal de saída, se o ID estiver em override.
+
+        O canal informado pelo módulo de sinal é ignorado.
+        """
+        key = int(can_id, 16)
+        if len(can_id) > 3:
+            key |= CAN_EFF_FLAG
+        if key not in self._overrides:
+            return
+        self.can.send_message(self.destination, can_id, data)
+        self.stats["injected"] += 1
+
+    def run(self, duration=None):
+        """
+        Repassa frames continuamente.
+
+        Args:
+            duration (float | None): Duração em segundos; None roda até Ctrl+C.
+        """
+        end = None if duration is None else time.perf_counter() + duration
+        try:
+            while end is None or time.perf_counter() < end:
+                if not self.poll():
+                    time.sleep(0.0005)
+        except KeyboardInterrupt:
+            pass
+        self.print_report()
+
+    def latency_percentiles(self, points=(50, 90, 99, 100), processing=False):
+        """
+        Args:
+            points (tuple[int]): Percentis desejados.
+            processing (bool): Usa só o tempo de processamento, sem a espera na serial.
+
+        Retorna:
+            dict[int, float]: Percentil -> latência em segundos.
+        """
+        return percentiles(self.processing if processing else self.latencies, points)
+
+    def print_report(self):
+        stats = self.stats
+        print(f"Bridge CAN{self.source} -> CAN{self.destination}: recebidos {stats['received']}, "
+              f"repassados {stats['forwarded']}, filtrados {stats['filtered']}, "
+              f"reescritos {stats['rewritten']}, injetados {stats['injected']}, "
+              f"malformados {stats['malformed']}")
+        for label, processing in (("Latência no host (desde o poll anterior)", False),
+                                  ("Só processamento", True)):
+            latency = self.latency_percentiles(processing=processing)
+            if latency:
+                print(f"  {label}: " + ", ".join(f"p{p} {value * 1e6:.0f} us" for p, value in latency.items()))
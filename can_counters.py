@@ -0,0 +1,292 @@
+"""
+can_counters.py
+
+Author: Leeo Santos
+Created: October 2026
+GitHub: https://github.com/c4pt4inroot
+
+Description:
+    Shared rolling counter and checksum engine for the signal modules.
+
+    Each module declares, once, where its rolling counters live inside the
+    frame (CounterSpec) and, if the message needs one, how its checksum byte
+    is computed (ChecksumSpec). The module then only calls `stamp()` right
+    before sending: the current counter values and the checksum are written
+    into the frame and the message is marked as sent.
+
+    The main loop calls `tick()` once per cycle, which advances every counter
+    of every message sent in that cycle in a single pass over flat lists,
+    instead of each module doing its own arithmetic.
+
+    If a message is stamped twice without a `tick()` in between (modules used
+    on their own, outside the main loop), the pending counters are advanced
+    first, so the frame still rolls.
+
+    `sequence()` returns the next frames a message would produce without
+    changing the engine state, so precomputed and replay paths stay in step
+    with the live loop.
+
+Usage:
+    from can_counters import COUNTERS, CounterSpec
+
+    COUNTERS.register(0x130, CounterSpec(byte=4, initial=0xEF))
+
+    COUNTERS.stamp(0x130, frame)
+    can.send_message(channel=1, can_id="130", data=frame)
+    ...
+    COUNTERS.tick()
+"""
+
+_crc8_tables = {}
+
+def crc8_table(poly):
+    """
+    Retorna (e guarda em cache) a tabela de 256 entradas para um CRC8.
+
+    Args:
+        poly (int): Polinômio do CRC8 (ex: 0x1D, SAE J1850).
+    """
+    table = _crc8_tables.get(poly)
+    if table is None:
+        table = []
+        for value in range(256):
+            crc = value
+            for _ in range(8):
+                crc = ((crc << 1) ^ poly) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+            table.append(crc)
+        _crc8_tables[poly] = table
+    return table
+
+def crc8(data, poly=0x1D, init=0x00, xor_out=0x00):
+    """
+    Calcula um CRC8 por tabela.
+
+    Args:
+        data (list[int]): Bytes a processar.
+        poly (int): Polinômio.
+        init (int): Valor inicial.
+        xor_out (int): XOR aplicado no resultado.
+    """
+    table = crc8_table(poly)
+    crc = init
+    for byte in data:
+        crc = table[crc ^ byte]
+    return crc ^ xor_out
+
+class CounterSpec:
+    """
+    Posição e regra de avanço de um contador rolante dentro de um frame.
+
+    O contador tem `bits` bits e fica deslocado `shift` bits a partir do byte
+    `byte` (little-endian quando ocupa mais de um byte). A cada ciclo avança
+    `step` (módulo 2**bits). Na escrita, `or_mask` é aplicado por cima do valor
+    e os bytes cobertos são substituídos por inteiro.
+    """
+    __slots__ = ("byte", "bits", "shift", "step", "initial", "or_mask", "mask", "length")
+
+    def __init__(self, byte, bits=8, shift=0, step=1, initial=0, or_mask=0x00):
+        """
+        Args:
+            byte (int): Primeiro byte do frame ocupado pelo contador.
+            bits (int): Largura do contador em bits.
+            shift (int): Deslocamento em bits dentro do primeiro byte.
+            step (int): Incremento por ciclo.
+            initial (int): Valor enviado no primeiro frame.
+            or_mask (int): Bits fixos forçados em 1 na escrita.
+        """
+        self.byte = byte
+        self.bits = bits
+        self.shift = shift
+        self.step = step
+        self.mask = (1 << bits) - 1
+        self.initial = initial & self.mask
+        self.or_mask = or_mask
+        self.length = (shift + bits + 7) // 8
+
+    def write(self, frame, value):
+        raw = (value << self.shift) | self.or_mask
+        for i in range(self.length):
+            frame[self.byte + i] = (raw >> (8 * i)) & 0xFF
+
+class ChecksumSpec:
+    """
+    Byte de checksum estilo BMW: CRC8 por tabela sobre os bytes do frame
+    (exceto o próprio checksum), opcionalmente semeado com o ID CAN.
+    """
+    __slots__ = ("byte", "poly", "init", "xor_out", "include_id")
+
+    def __init__(self, byte, poly=0x1D, init=0xFF, xor_out=0x00, include_id=False):
+        """
+        Args:
+            byte (int): Índice do byte de checksum no frame.
+            poly (int): Polinômio do CRC8.
+            init (int): Valor inicial do CRC.
+            xor_out (int): XOR final (varia por mensagem nos clusters F-series).
+            include_id (bool): Inclui os dois bytes do ID CAN no cálculo.
+        """
+        self.byte = byte
+        self.poly = poly
+        self.init = init
+        self.xor_out = xor_out
+        self.include_id = include_id
+        crc8_table(poly)
+
+    def write(self, frame, can_id):
+        payload = [b for i, b in enumerate(frame) if i != self.byte]
+        if self.include_id:
+            payload = [can_id & 0xFF, (can_id >> 8) & 0xFF] + payload
+        frame[self.byte] = crc8(payload, self.poly, self.init, self.xor_out)
+
+class CounterEngine:
+    def __init__(self):
+        # Listas paralelas: uma posição por contador registrado
+        self._specs = []
+        self._can_ids = []
+        self._values = []
+        self._steps = []
+        self._masks = []
+        self._active = []
+
+        self._index = {}        # (can_id, variant) -> [posições]
+        self._checksums = {}    # (can_id, variant) -> ChecksumSpec
+        self._frozen = set()
+        self._pending = False
+
+    def register(self, can_id, *specs, checksum=None, variant=None):
+        """
+        Declara os contadores (e o checksum opcional) de uma mensagem.
+
+        Args:
+            can_id (int): ID CAN da mensagem.
+            *specs (CounterSpec): Contadores presentes no frame.
+            checksum (ChecksumSpec | None): Checksum do frame, se houver.
+            variant (str | None): Distingue frames diferentes com o mesmo ID
+                (ex: ignição ON e OFF), cada um com seus próprios contadores.
+        """
+        key = (can_id, variant)
+        if key in self._index:
+            raise ValueError(f"Contadores já registrados para 0x{can_id:03X} ({variant})")
+
+        positions = []
+        for spec in specs:
+            positions.append(len(self._specs))
+            self._specs.append(spec)
+            self._can_ids.append(can_id)
+            self._values.append(spec.initial)
+            self._steps.append(0 if can_id in self._frozen else spec.step)
+            self._masks.append(spec.mask)
+            self._active.append(0)
+
+        self._index[key] = positions
+        if checksum is not None:
+            self._checksums[key] = checksum
+
+    def stamp(self, can_id, frame, variant=None):
+        """
+        Escreve os contadores atuais e o checksum no frame e marca a mensagem
+        como enviada neste ciclo.
+
+        Args:
+            can_id (int): ID CAN da mensagem.
+            frame (list[int]): Frame a ser atualizado no lugar.
+            variant (str | None): Variante registrada para o ID.
+
+        Retorna:
+            list[int]: O próprio frame.
+        """
+        key = (can_id, variant)
+        positions = self._index.get(key, ())
+
+        if positions and self._active[positions[0]]:
+            self.tick()
+
+        for i in positions:
+            self._specs[i].write(frame, self._values[i])
+            self._active[i] = 1
+        self._pending = self._pending or bool(positions)
+
+        checksum = self._checksums.get(key)
+        if checksum is not None:
+            checksum.write(frame, can_id)
+        return frame
+
+    def tick(self):
+        """
+        Avança, em uma única passada, todos os contadores das mensagens
+        enviadas desde o último tick.
+        """
+        if not self._pending:
+            return
+        self._values = [
+            (value + step * active) & mask
+            for value, step, active, mask in zip(self._values, self._steps, self._active, self._masks)
+        ]
+        self._active = [0] * len(self._active)
+        self._pending = False
+
+    def sequence(self, can_id, frame, count, variant=None):
+        """
+        Gera os próximos frames da mensagem sem alterar o estado do engine.
+
+        Args:
+            can_id (int): ID CAN da mensagem.
+            frame (list[int]): Frame base (não é modificado).
+            count (int): Quantidade de frames.
+            variant (str | None): Variante registrada para o ID.
+
+        Retorna:
+            list[list[int]]: Frames na ordem em que seriam enviados.
+        """
+        key = (can_id, variant)
+        positions = self._index.get(key, ())
+        checksum = self._checksums.get(key)
+
+        frames = []
+        for n in range(count):
+            out = list(frame)
+            for i in positions:
+                # Um stamp pendente já consumiu o valor atual
+                steps = n + self._active[i]
+                self._specs[i].write(out, (self._values[i] + self._steps[i] * steps) & self._masks[i])
+            if checksum is not None:
+                checksum.write(out, can_id)
+            frames.append(out)
+        return frames
+
+    def freeze(self, can_id, frozen=True):
+        """
+        Congela (ou libera) todos os contadores de um ID CAN.
+
+        Args:
+            can_id (int): ID CAN da mensagem.
+            frozen (bool): True para congelar, False para voltar a avançar.
+        """
+        if frozen:
+            self._frozen.add(can_id)
+        else:
+            self._frozen.discard(can_id)
+        for i, owner in enumerate(self._can_ids):
+            if owner == can_id:
+                self._steps[i] = 0 if frozen else self._specs[i].step
+
+    def skip(self, can_id, cycles=1):
+        """
+        Pula `cycles` valores dos contadores de um ID CAN.
+
+        Args:
+            can_id (int): ID CAN da mensagem.
+            cycles (int): Quantidade de valores a pular.
+        """
+        for i, owner in enumerate(self._can_ids):
+            if owner == can_id:
+                spec = self._specs[i]
+                self._values[i] = (self._values[i] + spec.step * cycles) & spec.mask
+
+    def reset(self):
+        """Volta todos os contadores ao valor inicial."""
+        self._values = [spec.initial for spec in self._specs]
+        self._active = [0] * len(self._specs)
+        self._pending = False
+
+# Instância compartilhada pelos módulos de sinal
+COUNTERS = CounterEngine()
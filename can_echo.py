@@ -0,0 +1,193 @@
+"""
+can_echo.py
+
+Author: Leeo Santos
+Created: October 2026
+GitHub: https://github.com/c4pt4inroot
+
+Description:
+    Closed-loop echo verification: checks that frames passed to
+    send_message actually reached the bus.
+
+    EchoVerifier wraps a CANInterface (or SocketCANInterface) the same way
+    FaultInjector does. Every frame sent is recorded in a small hash index
+    keyed by (ID, payload); the payload already carries the rolling counter,
+    so repeated frames are told apart by it. Frames read back, either on the
+    second channel wired to the same bus or as adapter echoes, are matched
+    against that index.
+
+    It reports, continuously:
+    - delivery ratio (frames not seen back within `window` seconds are lost)
+    - round-trip latency percentiles per ID
+    - out-of-order deliveries (a frame seen back after a newer frame of the same ID)
+    - malformed lines read back from the serial adapter (counted and skipped)
+
+    Memory is bounded: at most `max_pending` frames wait for their echo and
+    only the last `samples` latencies are kept per ID.
+
+Usage:
+    from usb_can import CANInterface
+    from can_echo import EchoVerifier
+
+    can = CANInterface(port="COM3")
+    can.setup_channel(channel=1, baudrate=100)
+    can.setup_channel(channel=2, baudrate=100)  # CAN2 ligado ao mesmo barramento
+
+    verifier = EchoVerifier(can, echo_channel=2)
+    send_rpm(verifier, 3000)
+    verifier.poll()   # chamar a cada ciclo do loop
+"""
+
+from collections import deque
+import time
+
+from can_bridge import percentiles
+
+class EchoVerifier:
+    def __init__(self, can, echo_channel=None, window=1.0, max_pending=4096, samples=1024, report_every=5.0):
+        """
+        Args:
+            can (CANInterface | SocketCANInterface): Interface CAN real.
+            echo_channel (int | None): Canal onde os frames voltam; None aceita qualquer canal.
+            window (float): Tempo (s) para um frame voltar antes de ser contado como perdido.
+            max_pending (int): Máximo de frames aguardando eco.
+            samples (int): Amostras de latência guardadas por ID.
+            report_every (float | None): Intervalo (s) do relatório em poll(); None desativa.
+        """
+        self.can = can
+        self.echo_channel = echo_channel
+        self.window = window
+        self.max_pending = max_pending
+        self.samples = samples
+        self.report_every = report_every
+
+        self._pending = {}       # (can_id, payload) -> deque[(seq, t)]
+        self._order = deque()    # (seq, t, key) na ordem de envio, para expirar
+        self._seq = 0
+        self._last_seq = {}      # can_id -> seq do último frame confirmado
+        self._latency = {}       # can_id -> deque de latências (s)
+        self._next_report = time.perf_counter() + (report_every or 0)
+
+        self.stats = {"sent": 0, "delivered": 0, "lost": 0, "out_of_order": 0, "unmatched": 0,
+                      "malformed": 0}
+
+    def __getattr__(self, name):
+        return getattr(self.can, name)
+
+    def send_message(self, channel, can_id, data):
+        """
+        Mesmo contrato de CANInterface.send_message; registra o frame para verificação.
+        """
+        self.can.send_message(channel, can_id, data)
+
+        now = time.perf_counter()
+        key = (can_id.upper(), bytes(data))
+        self._seq += 1
+
+        entries = self._pending.get(key)
+        if entries is None:
+            entries = self._pending[key] = deque()
+        entries.append((self._seq, now))
+        self._order.append((self._seq, now, key))
+        self.stats["sent"] += 1
+
+        if len(self._order) > self.max_pending:
+            self._expire_oldest()
+
+    def _expire_oldest(self):
+        seq, _, key = self._order.popleft()
+        entries = self._pending.get(key)
+        # Se o primeiro da fila não é este frame, ele já foi confirmado
+        if entries and entries[0][0] == seq:
+            entries.popleft()
+            if not entries:
+                del self._pending[key]
+            self.stats["lost"] += 1
+
+    def _receive(self):
+        if not hasattr(self.can, "read_lines"):
+            return self.can.receive_messages()
+
+        parse = self.can.parse_line
+        messages = []
+        for line in self.can.read_lines():
+            # Uma linha corrompida não pode interromper a verificação
+            try:
+                messages.append(parse(line.decode(errors="ignore")))
+            except (ValueError, IndexError):
+                self.stats["malformed"] += 1
+        return messages
+
+    def poll(self):
+        """
+        Lê os frames que voltaram, casa com os enviados e expira os antigos.
+
+        Retorna:
+            int: Frames confirmados nesta chamada.
+        """
+        now = time.perf_counter()
+        delivered = 0
+
+        for message in self._receive():
+            if message is None:
+                continue
+            if self.echo_channel is not None and message["channel"] != self.echo_channel:
+                continue
+
+            can_id = message["can_id"].upper()
+            entries = self._pending.get((can_id, bytes(message["data"])))
+            if not entries:
+                self.stats["unmatched"] += 1
+                continue
+
+            seq, sent_at = entries.popleft()
+            if not entries:
+                del self._pending[(can_id, bytes(message["data"]))]
+            delivered += 1
+
+            latency = self._latency.get(can_id)
+            if latency is None:
+                latency = self._latency[can_id] = deque(maxlen=self.samples)
+            latency.append(now - sent_at)
+
+            if seq < self._last_seq.get(can_id, 0):
+                self.stats["out_of_order"] += 1
+            else:
+                self._last_seq[can_id] = seq
+
+        self.stats["delivered"] += delivered
+
+        limit = now - self.window
+        while self._order and self._order[0][1] < limit:
+            self._expire_oldest()
+
+        if self.report_every and now >= self._next_report:
+            self._next_report = now + self.report_every
+            self.print_report()
+
+        return delivered
+
+    def delivery_ratio(self):
+        """
+        Retorna:
+            float | None: Confirmados / (confirmados + perdidos); None sem dados.
+        """
+        done = self.stats["delivered"] + self.stats["lost"]
+        return self.stats["delivered"] / done if done else None
+
+    def latency_percentiles(self):
+        """
+        Retorna:
+            dict[str, dict[int, float]]: ID -> percentis de latência em segundos.
+        """
+        return {can_id: percentiles(samples) for can_id, samples in self._latency.items()}
+
+    def print_report(self):
+        stats = self.stats
+        ratio = self.delivery_ratio()
+        ratio_str = f"{100.0 * ratio:.2f}%" if ratio is not None else "-"
+        print(f"Eco: enviados {stats['sent']}, confirmados {stats['delivered']}, perdidos {stats['lost']} "
+              f"(entrega {ratio_str}), fora de ordem {stats['out_of_order']}, sem par {stats['unmatched']}, "
+              f"malformados {stats['malformed']}")
+        for can_id, points in sorted(self.latency_percentiles().items()):
+            print(f"  0x{can_id}: " + ", ".join(f"p{p} {value * 1000:.2f} ms" for p, value in points.items()))
@@ -0,0 +1,297 @@
+"""
+can_stress.py
+
+Author: Leeo Santos
+Created: October 2026
+GitHub: https://github.com/c4pt4inroot
+
+Description:
+    Fault and stress injection on top of CANInterface, to check how the
+    cluster reacts to bus abuse.
+
+    StressTester floods chosen IDs at a target rate, or as fast as the
+    adapter accepts (rate=None). Every frame is encoded once, before the
+    loop starts, so the send loop only picks pre-encoded bytes and writes
+    them: encoding never limits the achieved rate. Rolling counters come
+    from can_counters and can be left rolling, frozen or skipped per ID.
+    At the end it reports the achieved rate versus the requested one.
+
+    FaultInjector wraps a CANInterface for the normal cluster loop and
+    drops periodic frames, sends frames with a wrong DLC and freezes or
+    skips rolling counters, without touching the signal modules.
+
+Usage:
+    from usb_can import CANInterface
+    from can_stress import StressTester, StressTarget
+
+    can = CANInterface(port="COM3")
+    can.setup_channel(channel=1, baudrate=100)
+
+    tester = StressTester(can)
+    report = tester.run([
+        StressTarget(0x1A6, [0x00] * 8, rate=1000),
+        StressTarget(0x0C0, [0xF0, 0xFF], rate=None, counter="freeze"),
+    ], duration=5)
+    tester.print_report(report)
+
+    Or from the command line:
+        python can_stress.py --port COM3 --flood 1A6:1000 --flood 0C0:0:F0FF --duration 5
+
+    The rolling counters come from the signal modules of the active cluster
+    profile (--profile), so counters registered by plugins are applied too.
+    In the cluster loop, FaultInjector is enabled by the --drop, --bad-dlc,
+    --freeze and --skip options of BMW_CLUSTER.py.
+"""
+
+import argparse
+import time
+
+from can_counters import COUNTERS
+
+COUNTER_MODES = ("roll", "freeze", "skip")
+
+def _format_id(can_id):
+    return f"{can_id:08X}" if can_id > 0x7FF else f"{can_id:03X}"
+
+class StressTarget:
+    def __init__(self, can_id, data, rate=None, channel=1, counter="roll", dlc=None, variant=None, cycle=256):
+        """
+        Descreve um ID a ser inundado.
+
+        Args:
+            can_id (int): ID CAN.
+            data (list[int]): Frame base (contadores registrados são aplicados por cima).
+            rate (float | None): Frames por segundo; None envia o mais rápido possível.
+            channel (int): Canal CAN (1 ou 2).
+            counter (str): "roll" (normal), "freeze" (valor fixo) ou "skip" (pula um valor a cada frame).
+            dlc (int | None): DLC forçado, para gerar frames com DLC inválido.
+            variant (str | None): Variante registrada no can_counters (ex: "on" na ignição).
+            cycle (int): Quantidade de frames pré-codificados antes de repetir.
+        """
+        if counter not in COUNTER_MODES:
+            raise ValueError(f"Modo de contador inválido: {counter}")
+
+        self.can_id = can_id
+        self.data = list(data)
+        self.rate = rate
+        self.channel = channel
+        self.counter = counter
+        self.dlc = dlc
+        self.variant = variant
+        self.cycle = cycle
+
+    def encode(self, can):
+        """
+        Pré-codifica o ciclo de frames do alvo.
+
+        Retorna:
+            list[bytes]: Comandos prontos para send_raw.
+        """
+        if self.counter == "freeze":
+            frames = COUNTERS.sequence(self.can_id, self.data, 1, variant=self.variant) * self.cycle
+        elif self.counter == "skip":
+            frames = COUNTERS.sequence(self.can_id, self.data, self.cycle * 2, variant=self.variant)[::2]
+        else:
+            frames = COUNTERS.sequence(self.can_id, self.data, self.cycle, variant=self.variant)
+
+        can_id_str = _format_id(self.can_id)
+        return [can.encode_message(self.channel, can_id_str, frame, dlc=self.dlc) for frame in frames]
+
+class StressTester:
+    def __init__(self, can, batch=32):
+        """
+        Args:
+            can (CANInterface): Interface CAN já configurada.
+            batch (int): Frames por escrita no modo de saturação.
+        """
+        self.can = can
+        self.batch = batch
+
+    def run(self, targets, duration):
+        """
+        Envia os alvos durante `duration` segundos.
+
+        Args:
+            targets (list[StressTarget]): IDs a inundar.
+            duration (float): Duração em segundos.
+
+        Retorna:
+            dict: Relatório com taxa pedida e alcançada por ID e totais.
+        """
+        encoded = [target.encode(self.can) for target in targets]
+        sizes = [len(frames) for frames in encoded]
+        position = [0] * len(targets)   # próximo frame do ciclo pré-codificado
+        sent = [0] * len(targets)       # frames efetivamente escritos
+        failed = 0
+        bytes_sent = 0
+        send_raw = self.can.send_raw
+        perf = time.perf_counter
+
+        paced = [i for i, t in enumerate(targets) if t.rate]
+        saturate = [i for i, t in enumerate(targets) if not t.rate]
+        periods = [1.0 / targets[i].rate for i in paced]
+
+        start = perf()
+        end = start + duration
+        next_due = [start] * len(paced)
+
+        now = start
+        while now < end:
+            chunk = []
+            owners = []
+
+            for n, i in enumerate(paced):
+                if now >= next_due[n]:
+                    chunk.append(encoded[i][position[i] % sizes[i]])
+                    owners.append(i)
+                    position[i] += 1
+                    next_due[n] += periods[n]
+
+            # Alvos sem taxa preenchem o restante do link
+            if saturate:
+                for _ in range(self.batch):
+                    for i in saturate:
+                        chunk.append(encoded[i][position[i] % sizes[i]])
+                        owners.append(i)
+                        position[i] += 1
+
+            if chunk:
+                written = send_raw(b"".join(chunk))
+                bytes_sent += written
+
+                # Só conta os frames que couberam inteiros no que foi escrito
+                delivered = 0
+                for frame, i in zip(chunk, owners):
+                    if written < len(frame):
+                        break
+                    written -= len(frame)
+                    sent[i] += 1
+                    delivered += 1
+                failed += len(chunk) - delivered
+            now = perf()
+
+        elapsed = now - start
+        report = {
+            "duration": elapsed,
+            "bytes_per_second": bytes_sent / elapsed if elapsed else 0.0,
+            "frames": sum(sent),
+            "failed": failed,
+            "targets": [],
+        }
+        for target, count in zip(targets, sent):
+            report["targets"].append({
+                "can_id": target.can_id,
+                "requested": target.rate,
+                "achieved": count / elapsed if elapsed else 0.0,
+                "sent": count,
+            })
+        return report
+
+    @staticmethod
+    def print_report(report):
+        print(f"Duração: {report['duration']:.2f} s  |  {report['frames']} frames  |  "
+              f"{report['failed']} falhas de escrita  |  {report['bytes_per_second']:.0f} B/s na serial")
+        for entry in report["targets"]:
+            requested = f"{entry['requested']:.0f}/s" if entry["requested"] else "máx"
+            ratio = ""
+            if entry["requested"]:
+                ratio = f" ({100.0 * entry['achieved'] / entry['requested']:.1f}%)"
+            print(f"  0x{_format_id(entry['can_id'])}: pedido {requested}, "
+                  f"alcançado {entry['achieved']:.0f}/s{ratio}")
+
+class FaultInjector:
+    def __init__(self, can, drop=None, bad_dlc=None, freeze=(), skip=None):
+        """
+        Envolve um CANInterface e injeta falhas nos frames do loop normal.
+
+        Args:
+            can (CANInterface): Interface CAN real.
+            drop (dict[int, int] | None): ID -> descarta um a cada N frames (1 descarta todos).
+            bad_dlc (dict[int, int] | None): ID -> DLC enviado no lugar do correto.
+            freeze (iterable[int]): IDs com contadores rolantes congelados.
+            skip (dict[int, int] | None): ID -> valores de contador pulados após cada envio.
+        """
+        self.can = can
+        self.drop = dict(drop or {})
+        self.bad_dlc = dict(bad_dlc or {})
+        self.skip = dict(skip or {})
+        self.seen = {}
+        self.dropped = {}
+        self.frozen = tuple(freeze)
+
+        for can_id in self.frozen:
+            COUNTERS.freeze(can_id)
+
+    def __getattr__(self, name):
+        return getattr(self.can, name)
+
+    def send_message(self, channel, can_id, data):
+        """
+        Mesmo contrato de CANInterface.send_message, com as falhas configuradas.
+        """
+        can_id_int = int(can_id, 16)
+        count = self.seen.get(can_id_int, 0) + 1
+        self.seen[can_id_int] = count
+
+        every = self.drop.get(can_id_int)
+        if every and count % every == 0:
+            self.dropped[can_id_int] = self.dropped.get(can_id_int, 0) + 1
+        elif can_id_int in self.bad_dlc:
+            try:
+                self.can.send_raw(self.can.encode_message(channel, can_id, data, dlc=self.bad_dlc[can_id_int]))
+            except Exception as e:
+                print(f"[ERRO] Falha ao enviar mensagem CAN: {e}")
+        else:
+            self.can.send_message(channel, can_id, data)
+
+        cycles = self.skip.get(can_id_int)
+        if cycles:
+            COUNTERS.skip(can_id_int, cycles)
+
+    def release(self):
+        """Libera os contadores congelados por este injetor."""
+        for can_id in self.frozen:
+            COUNTERS.freeze(can_id, frozen=False)
+
+def _parse_flood(value):
+    # ID[:RATE[:DATA]] - RATE 0 ou ausente = saturação
+    parts = value.split(":")
+    can_id = int(parts[0], 16)
+    rate = float(parts[1]) if len(parts) > 1 and parts[1] else 0
+    data = list(bytes.fromhex(parts[2])) if len(parts) > 2 else [0x00] * 8
+    return can_id, rate or None, data
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress e injeção de falhas no barramento CAN do cluster.")
+    parser.add_argument("--port", default="COM3")
+    parser.add_argument("--baudrate", type=int, default=100, help="Baudrate CAN em kbps")
+    parser.add_argument("--channel", type=int, default=1)
+    parser.add_argument("--flood", action="append", required=True, type=_parse_flood,
+                        metavar="ID[:RATE[:DATA]]", help="ID em hex, frames/s (0 = saturação) e dados em hex")
+    parser.add_argument("--counter", choices=COUNTER_MODES, default="roll")
+    parser.add_argument("--variant", default=None, help="Variante registrada no can_counters (ex: on)")
+    parser.add_argument("--dlc", type=lambda v: int(v, 16), default=None, help="DLC forçado (0-F)")
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--profile", default="e_series", help="Perfil cujos módulos registram os contadores")
+    parser.add_argument("--config", default=None, help="Arquivo de sinais e perfis")
+    args = parser.parse_args()
+
+    # Importa os módulos de sinal do perfil (inclusive plugins), que registram seus contadores
+    from signal_registry import DEFAULT_CONFIG, build_dispatch, load_config
+    build_dispatch(load_config(args.config or DEFAULT_CONFIG), args.profile)
+
+    from usb_can import CANInterface
+
+    can = CANInterface(port=args.port)
+    can.setup_channel(channel=args.channel, baudrate=args.baudrate)
+
+    targets = [
+        StressTarget(can_id, data, rate=rate, channel=args.channel, counter=args.counter,
+                     dlc=args.dlc, variant=args.variant)
+        for can_id, rate, data in args.flood
+    ]
+    tester = StressTester(can)
+    tester.print_report(tester.run(targets, args.duration))
+
+if __name__ == "__main__":
+    main()
@@ -11,8 +11,10 @@ Description:
     to simulate the system state on the cluster.
 
     The `send_abs` function updates and sends two CAN frames:
-    - The main ABS frame with a modified byte indicating system state.
-    - A counter frame used for timing control, with increment and masking.
+    - The main ABS frame, whose byte 2 upper nibble rotates by 3 each cycle.
+    - A counter frame used for timing control (nibble counter OR 0xF0).
+
+    Both counters are declared in can_counters and stamped before each send.
 
 Usage:
     from modules.abs import send_abs
@@ -20,12 +22,19 @@ Usage:
     send_abs(can, abs_enabled=False)
 """
 
+from can_counters import COUNTERS, CounterSpec
+
 CAN_BUS_ID_ABS = 0x19E
 CAN_BUS_ID_ABS_COUNTER = 0x0C0
 
 _abs_frame = [0x00, 0xE0, 0xB3, 0xFC, 0xF0, 0x43, 0x00, 0x65]
 _abs_counter_frame = [0xF0, 0xFF]
 
+# Byte 2: nibble superior avança de 3 em 3, nibble inferior fixo em 0x3
+COUNTERS.register(CAN_BUS_ID_ABS, CounterSpec(byte=2, bits=4, shift=4, step=3, initial=0xE, or_mask=0x03))
+# Byte 0: contador de 4 bits com OR em 0xF0
+COUNTERS.register(CAN_BUS_ID_ABS_COUNTER, CounterSpec(byte=0, bits=4, initial=0x0, or_mask=0xF0))
+
 def send_abs(can, abs_enabled: bool):
     """
     Envia mensagens ABS para o painel, se não estiver ativado.
@@ -35,14 +44,9 @@ def send_abs(can, abs_enabled: bool):
         abs_enabled (bool): Indica se o ABS está ativado.
     """
     if not abs_enabled:
-        # Atualiza o byte 2 do frame ABS
-        value = _abs_frame[2]
-        upper = (value >> 4) + 3
-        _abs_frame[2] = ((upper << 4) & 0xF0) | 0x03
+        COUNTERS.stamp(CAN_BUS_ID_ABS, _abs_frame)
+        COUNTERS.stamp(CAN_BUS_ID_ABS_COUNTER, _abs_counter_frame)
 
         # Envia os frames ABS
         can.send_message(channel=1, can_id=f"{CAN_BUS_ID_ABS:03X}", data=_abs_frame)
         can.send_message(channel=1, can_id=f"{CAN_BUS_ID_ABS_COUNTER:03X}", data=_abs_counter_frame)
-
-        # Incrementa o contador com OR em 0xF0
-        _abs_counter_frame[0] = ((_abs_counter_frame[0] + 1) & 0x0F) | 0xF0
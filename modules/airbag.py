@@ -10,8 +10,8 @@ Description:
     to the vehicle's dashboard cluster.
 
     The `send_airbag` function sends a predefined CAN frame when the airbag system
-    is disabled (airbag_enabled=False). It increments a byte in the frame to simulate
-    frame variation over time.
+    is disabled (airbag_enabled=False). Byte 0 is a rolling counter declared in
+    can_counters to simulate frame variation over time.
 
 Usage:
     from modules.airbag import send_airbag
@@ -19,10 +19,14 @@ Usage:
     send_airbag(can, airbag_enabled=False)
 """
 
+from can_counters import COUNTERS, CounterSpec
+
 CAN_BUS_ID_AIRBAG = 0x0D7
 
 _airbag_frame = [0xC3, 0xFF]
 
+COUNTERS.register(CAN_BUS_ID_AIRBAG, CounterSpec(byte=0, initial=0xC3))
+
 def send_airbag(can, airbag_enabled: bool):
     """
     Envia mensagem do airbag via CAN.
@@ -32,5 +36,5 @@ def send_airbag(can, airbag_enabled: bool):
         airbag_enabled (bool): True se airbag está ativo (não envia frame).
     """
     if not airbag_enabled:
-        can.send_message(channel=1, can_id=f"{CAN_BUS_ID_AIRBAG:03X}", data=_airbag_frame)
-        _airbag_frame[0] = (_airbag_frame[0] + 1) & 0xFF
\ No newline at end of file
+        COUNTERS.stamp(CAN_BUS_ID_AIRBAG, _airbag_frame)
+        can.send_message(channel=1, can_id=f"{CAN_BUS_ID_AIRBAG:03X}", data=_airbag_frame)
\ No newline at end of file
@@ -10,8 +10,10 @@ Description:
     over CAN to the vehicle dashboard.
 
     The send_engine_temperature function encodes the engine temperature
-    with a fixed offset and sends it as part of a CAN frame. A control byte
-    is incremented on each message to simulate dynamic data.
+    through the active calibration lookup table (calibration.py; the default
+    table is the original +48 offset) and sends it as part of a CAN frame.
+    Byte 2 is a rolling counter declared in can_counters to simulate
+    dynamic data.
 
 Usage:
     from modules.engine_temperature import send_engine_temperature
@@ -19,10 +21,15 @@ Usage:
     send_engine_temperature(can, temp_celsius=90)
 """
 
+from calibration import CALIBRATION, TEMP_MAX, TEMP_MIN
+from can_counters import COUNTERS, CounterSpec
+
 CAN_BUS_ID_ENGINE_TEMP = 0x1D0
 
 _engine_temp_frame = [0x00, 0xFF, 0x63, 0xCD, 0x5D, 0x37, 0xCD, 0xA8]
 
+COUNTERS.register(CAN_BUS_ID_ENGINE_TEMP, CounterSpec(byte=2, initial=0x64))
+
 def send_engine_temperature(can, temp_celsius: int):
     """
     Envia temperatura do motor via CAN.
@@ -31,11 +38,9 @@ def send_engine_temperature(can, temp_celsius: int):
         can (CANInterface): Instância da interface CAN.
         temp_celsius (int): Temperatura do motor em graus Celsius.
     """
-    # Converte temperatura (offset de +48)
-    temp_encoded = (temp_celsius + 48) & 0xFF
+    temp_celsius = max(TEMP_MIN, min(int(temp_celsius), TEMP_MAX))
+    temp_encoded = CALIBRATION.engine_temperature[temp_celsius - TEMP_MIN]
     _engine_temp_frame[0] = temp_encoded
 
-    # Incrementa byte de controle
-    _engine_temp_frame[2] = (_engine_temp_frame[2] + 1) & 0xFF
-
+    COUNTERS.stamp(CAN_BUS_ID_ENGINE_TEMP, _engine_temp_frame)
     can.send_message(channel=1, can_id=f"{CAN_BUS_ID_ENGINE_TEMP:03X}", data=_engine_temp_frame)
@@ -9,8 +9,9 @@ Description:
     This module provides functionality to send fuel level information
     over the CAN bus to the vehicle dashboard.
 
-    The send_fuel function maps the fuel percentage (0-100%) to the
-    appropriate encoded value and sends it in a CAN message.
+    The send_fuel function maps the fuel percentage (0-100%, 0.1% steps)
+    to the encoded value through the active calibration lookup table
+    (calibration.py) and sends it in a CAN message.
 
 Usage:
     from modules.fuel import send_fuel
@@ -18,12 +19,11 @@ Usage:
     send_fuel(can, fuel_percent=75)
 """
 
+from calibration import CALIBRATION, FUEL_STEPS
+
 CAN_BUS_ID_FUEL = 0x349
 _fuel_frame = [0x00, 0x00, 0x00, 0x00, 0x00]
 
-def _map_value(x, in_min, in_max, out_min, out_max):
-    return int((x - in_min) * (out_max - out_min) / (in_max - in_min) + out_min)
-
 def send_fuel(can, fuel_percent: int):
     """
     Envia o nível de combustível via CAN.
@@ -33,7 +33,7 @@ def send_fuel(can, fuel_percent: int):
         fuel_percent (int): Percentual de combustível (0 a 100).
     """
     fuel_percent = max(0, min(fuel_percent, 100))
-    fuel = _map_value(fuel_percent, 0, 100, 0, 8320)
+    fuel = CALIBRATION.fuel[int(round(fuel_percent * FUEL_STEPS / 100))]
 
     low = fuel & 0xFF
     high = (fuel >> 8) & 0xFF
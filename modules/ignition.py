@@ -11,8 +11,8 @@ Description:
     over the CAN bus to a vehicle dashboard.
 
     The send_ignition function sends a CAN message indicating whether
-    the ignition is ON or OFF. It also updates a rolling counter byte
-    in the frame for message tracking.
+    the ignition is ON or OFF. The rolling counter byte in the frame is
+    declared in can_counters and stamped before each send.
 
 Usage:
     from modules.ignition import send_ignition
@@ -21,11 +21,17 @@ Usage:
     send_ignition(can, ignition_on=False) # Turn ignition OFF
 """
 
+from can_counters import COUNTERS, CounterSpec
+
 CAN_BUS_ID_IGNITION = 0x130
 
 ignition_frame_on = [0x45, 0x42, 0x21, 0x8F, 0xEF]
 ignition_frame_off = [0x00, 0x00, 0xC0, 0x0F, 0xE2]
 
+# Contador rolante no byte 4, independente para ON e OFF
+COUNTERS.register(CAN_BUS_ID_IGNITION, CounterSpec(byte=4, initial=0xEF), variant="on")
+COUNTERS.register(CAN_BUS_ID_IGNITION, CounterSpec(byte=4, initial=0xE2), variant="off")
+
 def send_ignition(can, ignition_on):
     """
     Envia o frame de ignição ON ou OFF para o painel.
@@ -37,8 +43,8 @@ def send_ignition(can, ignition_on):
     global ignition_frame_on, ignition_frame_off
 
     if ignition_on:
+        COUNTERS.stamp(CAN_BUS_ID_IGNITION, ignition_frame_on, variant="on")
         can.send_message(channel=1, can_id=f"{CAN_BUS_ID_IGNITION:03X}", data=ignition_frame_on)
-        ignition_frame_on[4] = (ignition_frame_on[4] + 1) & 0xFF
     else:
-        can.send_message(channel=1, can_id=f"{CAN_BUS_ID_IGNITION:03X}", data=ignition_frame_off)
-        ignition_frame_off[4] = (ignition_frame_off[4] + 1) & 0xFF
\ No newline at end of file
+        COUNTERS.stamp(CAN_BUS_ID_IGNITION, ignition_frame_off, variant="off")
+        can.send_message(channel=1, can_id=f"{CAN_BUS_ID_IGNITION:03X}", data=ignition_frame_off)
\ No newline at end of file
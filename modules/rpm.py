@@ -9,14 +9,17 @@ Description:
     This module provides a function to send the engine RPM value
     via CAN bus to the vehicle dashboard.
 
-    The RPM value is expected between 0 and 8000 and is scaled 
-    to fit into a single byte in the CAN frame.
+    The RPM value is expected between 0 and 8000 and is encoded into a
+    single byte through the active calibration lookup table (calibration.py).
+    The default table keeps the original linear 0-8000 -> 0-128 scale.
 
 Usage:
     from modules.rpm import send_rpm
     send_rpm(can, rpm_value=3000)
 """
 
+from calibration import CALIBRATION, RPM_MAX
+
 CAN_BUS_ID_RPM = 0x175
 
 def send_rpm(can, rpm_value):
@@ -27,8 +30,8 @@ def send_rpm(can, rpm_value):
         can (CANInterface): Instância da interface CAN.
         rpm_value (int): Valor entre 0 e 8000.
     """
-    rpm_value = max(0, min(rpm_value, 8000))
-    rpm_byte = int((rpm_value / 8000) * 128) & 0xFF
+    rpm_value = max(0, min(int(rpm_value), RPM_MAX))
+    rpm_byte = CALIBRATION.rpm[rpm_value]
 
     frame = [0x00, 0x00, rpm_byte, 0x00, 0x00]
     can.send_message(channel=1, can_id=f"{CAN_BUS_ID_RPM:03X}", data=frame)
\ No newline at end of file
@@ -7,22 +7,28 @@ GitHub: https://github.com/c4pt4inroot
 
 Description:
     This module implements CAN message transmission for vehicle speed data.
-    It maintains an internal state to accumulate speed values and manages
-    a counter used in the CAN frame for timing or synchronization purposes.
+    It maintains an internal state to accumulate speed values. Bytes 6-7 carry
+    a 16-bit counter (+315 per frame, upper nibble forced to 0xF) declared in
+    can_counters.
 
     The send_speed function encodes the speed and counter into a CAN data frame
     and sends it via the provided CANInterface instance.
 
+    SpeedSweep sweeps the speed up and down, used by the cluster profiles.
+
 Usage:
     from modules.speed import send_speed
     send_speed(can, g_speed=50)
 """
 
+from can_counters import COUNTERS, CounterSpec
+
 CAN_BUS_ID_SPEED = 0x1A6
 
 # Estado interno do módulo
 _last_speed = 0
-_speed_counter = 0x00F0
+
+COUNTERS.register(CAN_BUS_ID_SPEED, CounterSpec(byte=6, bits=16, step=315, initial=0x022B, or_mask=0xF000))
 
 def send_speed(can, g_speed):
     """
@@ -32,24 +38,41 @@ def send_speed(can, g_speed):
         can (CANInterface): Instância da interface CAN.
         g_speed (int): Valor de velocidade para somar ao último.
     """
-    global _last_speed, _speed_counter
+    global _last_speed
 
     speed = g_speed + _last_speed
-    _speed_counter = (_speed_counter + 315) & 0xFFFF
 
     # Quebra em bytes
     speed_low = speed & 0xFF
     speed_high = (speed >> 8) & 0xFF
-    counter_low = _speed_counter & 0xFF
-    counter_high = ((_speed_counter >> 8) | 0xF0) & 0xFF
 
     data = [
         speed_low, speed_high,
         speed_low, speed_high,
         speed_low, speed_high,
-        counter_low, counter_high
+        0x00, 0x00
     ]
+    COUNTERS.stamp(CAN_BUS_ID_SPEED, data)
 
     can.send_message(channel=1, can_id=f"{CAN_BUS_ID_SPEED:03X}", data=data)
 
-    _last_speed = speed
\ No newline at end of file
+    _last_speed = speed
+
+class SpeedSweep:
+    def __init__(self, max_speed=280, step=1):
+        """
+        Varre a velocidade de 0 até max_speed e volta, um passo por envio.
+
+        Args:
+            max_speed (int): Velocidade em que a varredura inverte.
+            step (int): Incremento da velocidade.
+        """
+        self.max_speed = max_speed
+        self.step = step
+        self.current_speed = 0
+
+    def send(self, can):
+        send_speed(can, self.current_speed)
+        self.current_speed += self.step
+        if self.current_speed >= self.max_speed or self.current_speed <= 0:
+            self.step *= -1
@@ -10,14 +10,50 @@ Description:
     The send_time function encodes hour, minute, second, day, month, and year into a
     CAN data frame and transmits it through the given CANInterface instance.
 
+    TimeSender feeds the frame from the host clock instead: the encoded frame
+    is cached and only rebuilt when the second rolls over, and it is sent as
+    soon as the new second starts, so the cluster clock does not lag. It
+    supports a timezone, a fixed offset and a fast-forward simulated clock
+    (start date + rate) to test date rollover.
+
 Usage:
     from modules.time import send_time
     send_time(can, hour=14, minute=35, second=12, day=21, month=6, year=2025)
+
+    from modules.time import TimeSender
+    clock = TimeSender(tz="Europe/Lisbon")
+    clock.send(can)  # chamar a cada ciclo do loop
+
+    # Virada de ano em 30 s, com o relógio 60x mais rápido
+    clock = TimeSender(start="2025-12-31T23:30:00", rate=60)
 """
 
+from datetime import datetime, timedelta, timezone
+import time
+
 CAN_BUS_ID_TIME = 0x39E
 _time_frame = [0x0B, 0x10, 0x00, 0x0D, 0x1F, 0xDF, 0x07, 0xF2]
 
+def encode_time(frame, hour, minute, second, day, month, year):
+    """
+    Codifica data e hora no frame 0x39E.
+
+    Args:
+        frame (list[int]): Frame de 8 bytes atualizado no lugar.
+        hour, minute, second, day, month, year (int): Data e hora.
+
+    Retorna:
+        list[int]: O próprio frame.
+    """
+    frame[0] = hour & 0xFF
+    frame[1] = minute & 0xFF
+    frame[2] = second & 0xFF
+    frame[3] = day & 0xFF
+    frame[4] = ((month << 4) & 0xF0) | 0x0F
+    frame[5] = year & 0xFF
+    frame[6] = (year >> 8) & 0xFF
+    return frame
+
 def send_time(can, hour, minute, second, day, month, year):
     """
     Envia data e hora via CAN para o painel.
@@ -31,12 +67,84 @@ def send_time(can, hour, minute, second, day, month, year):
         month (int): Mês (1–12)
         year (int): Ano (ex: 2025)
     """
-    _time_frame[0] = hour & 0xFF
-    _time_frame[1] = minute & 0xFF
-    _time_frame[2] = second & 0xFF
-    _time_frame[3] = day & 0xFF
-    _time_frame[4] = ((month << 4) & 0xF0) | 0x0F
-    _time_frame[5] = year & 0xFF
-    _time_frame[6] = (year >> 8) & 0xFF
+    encode_time(_time_frame, hour, minute, second, day, month, year)
 
     can.send_message(channel=1, can_id=f"{CAN_BUS_ID_TIME:03X}", data=_time_frame)
+
+def _resolve_tz(tz):
+    if tz is None or hasattr(tz, "utcoffset"):
+        return tz
+    if isinstance(tz, (int, float)):
+        return timezone(timedelta(hours=tz))
+    from zoneinfo import ZoneInfo
+    return ZoneInfo(tz)
+
+class TimeSender:
+    def __init__(self, tz=None, offset=0.0, start=None, rate=1.0, refresh=1.0):
+        """
+        Relógio para o frame 0x39E alimentado pelo relógio do host.
+
+        Args:
+            tz (str | float | tzinfo | None): Fuso (ex: 'Europe/Lisbon'), deslocamento
+                em horas ou tzinfo; None usa a hora local.
+            offset (float): Segundos somados à hora.
+            start (str | datetime | None): Início do relógio simulado (ISO 8601); sem
+                fuso, é interpretado em `tz`.
+            rate (float): Velocidade do relógio simulado (60 = 1 min por segundo).
+            refresh (float): Reenvia o frame em cache se passar este tempo (s) sem envio.
+        """
+        self.tz = _resolve_tz(tz)
+        self.offset = timedelta(seconds=offset)
+        self.rate = rate
+        self.refresh = refresh
+        self.simulated = start is not None or rate != 1.0
+
+        if self.simulated:
+            if start is None:
+                start = datetime.now(self.tz)
+            elif isinstance(start, str):
+                start = datetime.fromisoformat(start)
+
+            # Início sem fuso é interpretado no fuso pedido; com fuso, convertido
+            if self.tz is not None:
+                if start.tzinfo is None:
+                    start = start.replace(tzinfo=self.tz)
+                else:
+                    start = start.astimezone(self.tz)
+            self._origin = start
+            self._t0 = time.monotonic()
+
+        self._frame = list(_time_frame)
+        self._second = None
+        self._last_send = None
+
+    def now(self):
+        """
+        Retorna:
+            datetime: Hora atual do relógio (host ou simulado), com offset.
+        """
+        if self.simulated:
+            elapsed = (time.monotonic() - self._t0) * self.rate
+            return self._origin + timedelta(seconds=elapsed) + self.offset
+        return datetime.now(self.tz) + self.offset
+
+    def send(self, can):
+        """
+        Envia o frame de hora assim que o segundo vira (ou a cada `refresh` s).
+
+        Args:
+            can (CANInterface): Instância da interface CAN.
+        """
+        now = self.now()
+        second = now.replace(microsecond=0)
+        mono = time.monotonic()
+
+        if second != self._second:
+            # Novo segundo: reconstrói o frame em cache e envia já
+            self._second = second
+            encode_time(self._frame, now.hour, now.minute, now.second, now.day, now.month, now.year)
+        elif mono - self._last_send < self.refresh:
+            return
+
+        self._last_send = mono
+        can.send_message(channel=1, can_id=f"{CAN_BUS_ID_TIME:03X}", data=self._frame)
@@ -0,0 +1,165 @@
+"""
+signal_registry.py
+
+Author: Leeo Santos
+Created: October 2026
+GitHub: https://github.com/c4pt4inroot
+
+Description:
+    Plugin registry for the signal modules.
+
+    Signals are declared by name in a JSON config file (cluster_profiles.json)
+    or by installed packages through the "bmw_cluster.signals" entry point
+    group. Each cluster profile lists the signals it needs, in send order,
+    with how often they run (every N ticks) and their arguments.
+
+    Only the modules used by the active profile are imported. At startup the
+    profile is turned into one flat dispatch table of (every, callable) that
+    the main loop walks on each tick, so new vehicle-specific signals do not
+    require editing BMW_CLUSTER.py.
+
+    Signal targets are "module:attribute". A function is called as
+    fn(can, **kwargs). A class is instantiated once with "init" and its
+    "method" is called as obj.method(can, **kwargs); the method can also be
+    given in the target itself ("module:Class.method"), which is the form
+    entry points use.
+
+    The time spent importing each module is recorded, so the startup cost
+    can be checked as the module count grows (--profile-import).
+
+Usage:
+    from signal_registry import build_dispatch, load_config
+
+    config = load_config("cluster_profiles.json")
+    dispatch, import_times = build_dispatch(config, profile="e_series")
+
+    for every, send in dispatch:
+        if counter % every == 0:
+            send(can)
+"""
+
+import functools
+import importlib
+import json
+import os
+import sys
+import time
+
+ENTRY_POINT_GROUP = "bmw_cluster.signals"
+DEFAULT_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cluster_profiles.json")
+
+def load_config(path=DEFAULT_CONFIG):
+    """
+    Lê o arquivo de configuração de sinais e perfis.
+
+    Args:
+        path (str): Caminho do JSON.
+
+    Retorna:
+        dict: Configuração com as chaves 'signals' e 'profiles'.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    config.setdefault("signals", {})
+    config.setdefault("profiles", {})
+
+    for profile, settings in config["profiles"].items():
+        for entry in settings.get("signals", []):
+            _every(profile, entry)
+    return config
+
+def _every(profile, entry):
+    every = entry.get("every", 1)
+    if not isinstance(every, int) or isinstance(every, bool) or every < 1:
+        raise ValueError(f"Perfil '{profile}', sinal '{entry.get('name')}': "
+                         f"'every' deve ser um inteiro >= 1 (recebido {every!r})")
+    return every
+
+def entry_point_signals():
+    """
+    Lista os sinais registrados por pacotes instalados, sem importá-los.
+
+    Retorna:
+        dict: nome -> {'target': 'modulo:atributo' ou 'modulo:Classe.metodo'}
+    """
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        return {}
+
+    eps = entry_points()
+    if hasattr(eps, "select"):
+        eps = eps.select(group=ENTRY_POINT_GROUP)
+    else:
+        eps = eps.get(ENTRY_POINT_GROUP, [])
+    return {ep.name: {"target": ep.value} for ep in eps}
+
+def _import_target(target, import_times):
+    # Retorna (objeto, método); o método vem de 'modulo:Classe.metodo'
+    module_name, _, attr = target.partition(":")
+    if not attr:
+        raise ValueError(f"Alvo inválido '{target}' (esperado 'modulo:atributo')")
+
+    if module_name not in sys.modules:
+        start = time.perf_counter()
+        importlib.import_module(module_name)
+        import_times[module_name] = time.perf_counter() - start
+
+    obj = sys.modules[module_name]
+    parts = attr.split(".")
+    for n, part in enumerate(parts):
+        obj = getattr(obj, part)
+        if isinstance(obj, type):
+            remaining = parts[n + 1:]
+            if len(remaining) > 1:
+                raise ValueError(f"Alvo inválido '{target}' (esperado 'modulo:Classe.metodo')")
+            return obj, remaining[0] if remaining else None
+    return obj, None
+
+def build_dispatch(config, profile):
+    """
+    Importa os sinais do perfil e monta a tabela de despacho.
+
+    Args:
+        config (dict): Configuração retornada por load_config.
+        profile (str): Nome do perfil de cluster ativo.
+
+    Retorna:
+        tuple[list, dict]: Lista de (every, callable(can)) na ordem de envio
+        e tempo de importação (s) de cada módulo importado.
+    """
+    if profile not in config["profiles"]:
+        raise ValueError(f"Perfil desconhecido: {profile}")
+
+    # Sinais do arquivo de configuração têm prioridade sobre entry points
+    catalog = entry_point_signals()
+    catalog.update(config["signals"])
+
+    dispatch = []
+    import_times = {}
+    for entry in config["profiles"][profile]["signals"]:
+        name = entry["name"]
+        if name not in catalog:
+            raise ValueError(f"Sinal '{name}' não registrado")
+
+        spec = catalog[name]
+        target, method = _import_target(spec["target"], import_times)
+        method = spec.get("method", method)
+        kwargs = entry.get("kwargs", {})
+
+        if isinstance(target, type):
+            if method is None:
+                raise ValueError(f"Sinal '{name}': '{spec['target']}' é uma classe; informe o método "
+                                 f"em 'method' ou no alvo ('modulo:Classe.metodo')")
+            instance = target(**entry.get("init", {}))
+            target = getattr(instance, method)
+
+        dispatch.append((_every(profile, entry), functools.partial(target, **kwargs)))
+
+    return dispatch, import_times
+
+def print_import_report(import_times):
+    total = sum(import_times.values())
+    print(f"Importação dos módulos de sinal: {len(import_times)} módulos, {total * 1000:.2f} ms")
+    for module_name, elapsed in sorted(import_times.items(), key=lambda item: item[1], reverse=True):
+        print(f"  {elapsed * 1000:8.2f} ms  {module_name}")
@@ -0,0 +1,361 @@
+"""
+socket_can.py
+
+Author: Leeo Santos
+Created: October 2026
+GitHub: https://github.com/c4pt4inroot
+
+Description:
+    Native SocketCAN backend (Linux) with the same API as CANInterface.
+
+    Frames are packed directly into `struct can_frame` from the binary
+    payload and written to a raw CAN socket, so there is no hex formatting
+    on send and no hex parsing on receive. Each CAN channel (1 or 2) is
+    mapped to a network interface (e.g. can0, can1, vcan0).
+
+    SocketCANInterface provides:
+    - send_message / receive_message, same arguments and return as CANInterface
+    - send_messages, to pack and send a batch of frames in one call
+    - encode_message / send_raw, so pre-encoded paths (can_stress) work unchanged
+    - receive_messages, a non-blocking batch read of everything pending
+
+    The CAN bitrate of a SocketCAN interface is set by the system
+    (`ip link set can0 type can bitrate 100000`), not by this class:
+    setup_channel only checks the value and shows the command.
+
+    A raw CAN socket does not receive the frames it sent itself. When the
+    echo is read on the sending channel (can_echo.EchoVerifier with no echo
+    channel, or echo_channel equal to the sending channel), open it with
+    recv_own_msgs=True (CAN_RAW_RECV_OWN_MSGS).
+
+    Running this file compares the frame throughput of this backend with the
+    ASCII encoding used by the serial adapter. Without a vcan/can interface
+    an in-process stand-in (a SOCK_SEQPACKET socket pair) is used.
+
+Dependencies:
+    - Linux with SocketCAN (AF_CAN)
+
+Usage Example:
+    from socket_can import SocketCANInterface
+
+    can = SocketCANInterface(interfaces={1: "can0"})
+    can.setup_channel(channel=1, baudrate=100)
+    can.send_message(channel=1, can_id="1A6", data=[0x01, 0x02, 0x03])
+    message = can.receive_message()
+    if message:
+        print(message)
+
+    Benchmark:
+        python socket_can.py --interface vcan0 --frames 100000
+"""
+
+import argparse
+import select
+import socket
+import struct
+import threading
+import time
+
+CAN_EFF_FLAG = 0x80000000
+CAN_RTR_FLAG = 0x40000000
+CAN_ERR_FLAG = 0x20000000
+CAN_EFF_MASK = 0x1FFFFFFF
+CAN_SFF_MASK = 0x000007FF
+
+# struct can_frame: can_id (u32), len (u8), 3 bytes de padding, data[8]
+CAN_FRAME = struct.Struct("=IB3x8s")
+FRAME_SIZE = CAN_FRAME.size
+
+# Registro usado por encode_message/send_raw: 1 byte de canal + can_frame
+RECORD_SIZE = 1 + FRAME_SIZE
+
+class SocketCANInterface:
+    BAUD_RATE_COMMANDS = (10, 50, 100, 125, 250, 400, 500, 800, 900)
+    #---------------------------------------------------------------------------------------------------------
+    def __init__(self, interfaces=None, timeout=1, sockets=None, recv_own_msgs=False):
+        """
+        Abre um socket CAN raw por canal.
+
+        Args:
+            interfaces (dict[int, str] | None): Canal -> interface (padrão {1: 'can0'}).
+            timeout (float): Timeout de receive_message, em segundos.
+            sockets (dict[int, socket.socket] | None): Sockets já abertos por canal,
+                usados no lugar das interfaces (ex: substitutos em processo).
+            recv_own_msgs (bool): Recebe de volta os frames enviados pelo próprio
+                socket (eco para can_echo.EchoVerifier).
+        """
+        self.timeout = timeout
+        self._sockets = {}
+
+        if sockets:
+            self._sockets.update(sockets)
+        else:
+            for channel, interface in (interfaces or {1: "can0"}).items():
+                try:
+                    sock = socket.socket(socket.AF_CAN, socket.SOCK_RAW, socket.CAN_RAW)
+                    if recv_own_msgs:
+                        sock.setsockopt(socket.SOL_CAN_RAW, socket.CAN_RAW_RECV_OWN_MSGS, 1)
+                    sock.bind((interface,))
+                    self._sockets[channel] = sock
+                    print(f"[OK] Conectado à interface {interface} (CAN{channel})")
+                except Exception as e:
+                    print(f"[ERRO] Não foi possível abrir a interface {interface}: {e}")
+
+        self._channel_of = {sock.fileno(): channel for channel, sock in self._sockets.items()}
+        self._rx_buffer = bytearray(FRAME_SIZE * 256)
+        self._ids = {}
+    #---------------------------------------------------------------------------------------------------------
+    def is_connected(self):
+        return bool(self._sockets)
+    #---------------------------------------------------------------------------------------------------------
+    def setup_channel(self, channel, baudrate):
+        """
+        Confere a configuração de um canal CAN.
+
+        Args:
+            channel (int): Canal (1 ou 2).
+            baudrate (int): Baudrate CAN em kbps.
+        """
+        try:
+            if baudrate not in self.BAUD_RATE_COMMANDS:
+                raise ValueError(f"Baudrate inválido: {baudrate}")
+            if channel not in self._sockets:
+                raise ValueError(f"CAN{channel} sem interface SocketCAN")
+
+            print(f"CAN{channel}: bitrate definido pelo sistema "
+                  f"(ip link set <interface> type can bitrate {baudrate * 1000})")
+
+        except Exception as e:
+            print(f"[ERRO] Falha ao configurar CAN{channel}: {e}")
+    #---------------------------------------------------------------------------------------------------------
+    def _parse_id(self, can_id):
+        # Converte o ID em hexadecimal uma única vez por ID
+        raw = self._ids.get(can_id)
+        if raw is None:
+            raw = int(can_id, 16)
+            if len(can_id) > 3:
+                raw |= CAN_EFF_FLAG
+            self._ids[can_id] = raw
+        return raw
+    #---------------------------------------------------------------------------------------------------------
+    def encode_message(self, channel, can_id, data, dlc=None):
+        """
+        Monta o registro binário (canal + struct can_frame) de uma mensagem.
+
+        Args:
+            channel (int): Canal CAN (1 ou 2).
+            can_id (str): ID CAN em hexadecimal (ex: '26E' ou '1ABCDE12').
+            data (list[int]): Lista com até 8 bytes (0-255).
+            dlc (int | None): Força um DLC diferente do tamanho dos dados.
+
+        Retorna:
+            bytes: Registro para send_raw.
+        """
+        if not (1 <= channel <= 2):
+            raise ValueError("Canal deve ser 1 ou 2.")
+
+        if len(data) > 8:
+            raise ValueError("Mensagem CAN deve ter até 8 bytes.")
+
+        if dlc is None:
+            dlc = len(data)
+        return bytes((channel,)) + CAN_FRAME.pack(self._parse_id(can_id), dlc, bytes(data))
+    #---------------------------------------------------------------------------------------------------------
+    def send_raw(self, payload):
+        """
+        Envia registros já codificados por encode_message (um ou vários concatenados).
+
+        Args:
+            payload (bytes): Registros concatenados.
+
+        Retorna:
+            int: Bytes de registros enviados (0 em caso de falha).
+        """
+        view = memoryview(payload)
+        sent = 0
+        try:
+            for offset in range(0, len(view) - RECORD_SIZE + 1, RECORD_SIZE):
+                self._sockets[view[offset]].send(view[offset + 1:offset + RECORD_SIZE])
+                sent += RECORD_SIZE
+        except Exception as e:
+            print(f"[ERRO] Falha ao enviar mensagem CAN: {e}")
+        return sent
+    #---------------------------------------------------------------------------------------------------------
+    def send_message(self, channel, can_id, data):
+        """
+        Envia uma mensagem CAN no canal especificado.
+
+        Args:
+            channel (int): Canal CAN (1 ou 2).
+            can_id (str): ID CAN em hexadecimal (ex: '26E' ou '1ABCDE12').
+            data (list[int]): Lista com até 8 bytes (0-255).
+        """
+        try:
+            sock = self._sockets.get(channel)
+            if sock is None:
+                raise Exception(f"CAN{channel} sem interface SocketCAN.")
+
+            if len(data) > 8:
+                raise ValueError("Mensagem CAN deve ter até 8 bytes.")
+
+            sock.send(CAN_FRAME.pack(self._parse_id(can_id), len(data), bytes(data)))
+
+        except Exception as e:
+            print(f"[ERRO] Falha ao enviar mensagem CAN: {e}")
+    #---------------------------------------------------------------------------------------------------------
+    def send_messages(self, messages):
+        """
+        Envia um lote de mensagens.
+
+        Args:
+            messages (iterable[tuple[int, str, list[int]]]): (canal, can_id, data).
+
+        Retorna:
+            int: Mensagens enviadas.
+        """
+        pack = CAN_FRAME.pack
+        parse_id = self._parse_id
+        sockets = self._sockets
+        sent = 0
+        try:
+            for channel, can_id, data in messages:
+                sockets[channel].send(pack(parse_id(can_id), len(data), bytes(data)))
+                sent += 1
+        except Exception as e:
+            print(f"[ERRO] Falha ao enviar mensagem CAN: {e}")
+        return sent
+    #---------------------------------------------------------------------------------------------------------
+    def _decode(self, channel, frame):
+        raw_id, dlc, payload = CAN_FRAME.unpack_from(frame)
+        if raw_id & CAN_EFF_FLAG:
+            can_id = f"{raw_id & CAN_EFF_MASK:08X}"
+        else:
+            can_id = f"{raw_id & CAN_SFF_MASK:03X}"
+        return {
+            "channel": channel,
+            "can_id": can_id,
+            "data": list(payload[:min(dlc, 8)])
+        }
+    #---------------------------------------------------------------------------------------------------------
+    def receive_message(self):
+        """
+        Recebe uma mensagem CAN, esperando até `timeout` segundos.
+
+        Retorna:
+            dict | None: Um dicionário com 'channel', 'can_id', 'data', ou None se nada for lido.
+        """
+        try:
+            if not self.is_connected():
+                raise Exception("SocketCAN not connected.")
+
+            ready, _, _ = select.select(list(self._sockets.values()), [], [], self.timeout)
+            if not ready:
+                return None
+
+            sock = ready[0]
+            frame = sock.recv(FRAME_SIZE)
+            return self._decode(self._channel_of[sock.fileno()], frame)
+
+        except Exception as e:
+            print(f"[ERRO] Falha ao receber mensagem CAN: {e}")
+            return None
+    #---------------------------------------------------------------------------------------------------------
+    def receive_messages(self, max_frames=256):
+        """
+        Lê, sem bloquear, todas as mensagens pendentes (até max_frames por canal).
+
+        Retorna:
+            list[dict]: Mensagens no mesmo formato de receive_message.
+        """
+        messages = []
+        view = memoryview(self._rx_buffer)
+        limit = min(max_frames, len(self._rx_buffer) // FRAME_SIZE)
+        try:
+            for channel, sock in self._sockets.items():
+                count = 0
+                while count < limit:
+                    try:
+                        sock.recv_into(view[count * FRAME_SIZE:], FRAME_SIZE, socket.MSG_DONTWAIT)
+                    except BlockingIOError:
+                        break
+                    count += 1
+                for i in range(count):
+                    messages.append(self._decode(channel, view[i * FRAME_SIZE:(i + 1) * FRAME_SIZE]))
+        except Exception as e:
+            print(f"[ERRO] Falha ao receber mensagem CAN: {e}")
+        return messages
+    #---------------------------------------------------------------------------------------------------------
+    def close(self):
+        for sock in self._sockets.values():
+            sock.close()
+        self._sockets = {}
+
+def _drain(sock, stop):
+    buffer = bytearray(FRAME_SIZE)
+    sock.settimeout(0.1)
+    while not stop.is_set():
+        try:
+            sock.recv_into(buffer)
+        except (socket.timeout, OSError):
+            pass
+
+def _rate(count, elapsed):
+    return count / elapsed if elapsed else 0.0
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara SocketCAN com a codificação ASCII da serial.")
+    parser.add_argument("--interface", default=None, help="Interface vcan/can (padrão: substituto em processo)")
+    parser.add_argument("--frames", type=int, default=100000)
+    args = parser.parse_args()
+
+    stop = threading.Event()
+    if args.interface:
+        can = SocketCANInterface(interfaces={1: args.interface})
+        reader = None
+    else:
+        tx, rx = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        can = SocketCANInterface(sockets={1: tx})
+        reader = threading.Thread(target=_drain, args=(rx, stop), daemon=True)
+        reader.start()
+
+    data = [0x11, 0x22, 0x33, 0x44, 0x55, 0x66, 0x77, 0x88]
+    n = args.frames
+
+    # Caminho serial: só a montagem do comando ASCII (sem custo de escrita)
+    from usb_can import encode_ascii
+    start = time.perf_counter()
+    for _ in range(n):
+        encode_ascii(1, "1A6", data)
+    serial_rate = _rate(n, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(n):
+        can.encode_message(1, "1A6", data)
+    encode_rate = _rate(n, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(n):
+        can.send_message(1, "1A6", data)
+    send_rate = _rate(n, time.perf_counter() - start)
+
+    batch = [(1, "1A6", data)] * 64
+    start = time.perf_counter()
+    sent = 0
+    while sent < n:
+        sent += can.send_messages(batch)
+    batch_rate = _rate(sent, time.perf_counter() - start)
+
+    stop.set()
+    if reader is not None:
+        reader.join()
+    can.close()
+
+    target = args.interface or "substituto em processo"
+    print(f"{n} frames de 8 bytes ({target}):")
+    print(f"  Serial ASCII, só codificação: {serial_rate:12.0f} frames/s")
+    print(f"  SocketCAN, só codificação:    {encode_rate:12.0f} frames/s")
+    print(f"  SocketCAN send_message:       {send_rate:12.0f} frames/s")
+    print(f"  SocketCAN send_messages (64): {batch_rate:12.0f} frames/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Tests for can_counters.py: the shared engine must keep producing the same
+frames as the per-module arithmetic it replaced, and stamp/tick/sequence/
+freeze/skip must keep their documented semantics.
+"""
+
+import pytest
+
+from calibration import CALIBRATION
+from can_counters import COUNTERS, ChecksumSpec, CounterEngine, CounterSpec, crc8
+import modules.abs
+import modules.airbag
+import modules.enginetemperature
+import modules.ignition
+import modules.speed
+
+class RecordingCAN:
+    def __init__(self):
+        self.frames = []
+
+    def send_message(self, channel, can_id, data):
+        self.frames.append((can_id, list(data)))
+
+@pytest.fixture
+def can(monkeypatch):
+    CALIBRATION.load("linear")
+    COUNTERS.reset()
+    monkeypatch.setattr(modules.speed, "_last_speed", 0)
+    yield RecordingCAN()
+    COUNTERS.reset()
+
+def _cycle(can, ignition_on=True):
+    # Mesma ordem do perfil e_series, com todos os módulos a cada ciclo
+    modules.ignition.send_ignition(can, ignition_on=ignition_on)
+    modules.speed.send_speed(can, 1)
+    modules.abs.send_abs(can, abs_enabled=False)
+    modules.airbag.send_airbag(can, airbag_enabled=False)
+    modules.enginetemperature.send_engine_temperature(can, temp_celsius=100)
+    COUNTERS.tick()
+
+def _baseline_frames(cycles, ignition_on=True):
+    # Aritmética original de cada módulo, antes do can_counters
+    ignition = [0x45, 0x42, 0x21, 0x8F, 0xEF] if ignition_on else [0x00, 0x00, 0xC0, 0x0F, 0xE2]
+    abs_frame = [0x00, 0xE0, 0xB3, 0xFC, 0xF0, 0x43, 0x00, 0x65]
+    abs_counter = [0xF0, 0xFF]
+    airbag = [0xC3, 0xFF]
+    temp = [0x00, 0xFF, 0x63, 0xCD, 0x5D, 0x37, 0xCD, 0xA8]
+    last_speed, speed_counter = 0, 0x00F0
+
+    frames = []
+    for _ in range(cycles):
+        frames.append(("130", list(ignition)))
+        ignition[4] = (ignition[4] + 1) & 0xFF
+
+        speed = 1 + last_speed
+        speed_counter = (speed_counter + 315) & 0xFFFF
+        low, high = speed & 0xFF, (speed >> 8) & 0xFF
+        frames.append(("1A6", [low, high, low, high, low, high,
+                               speed_counter & 0xFF, ((speed_counter >> 8) | 0xF0) & 0xFF]))
+        last_speed = speed
+
+        abs_frame[2] = ((((abs_frame[2] >> 4) + 3) << 4) & 0xF0) | 0x03
+        frames.append(("19E", list(abs_frame)))
+        frames.append(("0C0", list(abs_counter)))
+        abs_counter[0] = ((abs_counter[0] + 1) & 0x0F) | 0xF0
+
+        frames.append(("0D7", list(airbag)))
+        airbag[0] = (airbag[0] + 1) & 0xFF
+
+        temp[0] = (100 + 48) & 0xFF
+        temp[2] = (temp[2] + 1) & 0xFF
+        frames.append(("1D0", list(temp)))
+    return frames
+
+def test_first_frames(can):
+    _cycle(can)
+    _cycle(can)
+    assert can.frames == [
+        ("130", [0x45, 0x42, 0x21, 0x8F, 0xEF]),
+        ("1A6", [0x01, 0x00, 0x01, 0x00, 0x01, 0x00, 0x2B, 0xF2]),
+        ("19E", [0x00, 0xE0, 0xE3, 0xFC, 0xF0, 0x43, 0x00, 0x65]),
+        ("0C0", [0xF0, 0xFF]),
+        ("0D7", [0xC3, 0xFF]),
+        ("1D0", [0x94, 0xFF, 0x64, 0xCD, 0x5D, 0x37, 0xCD, 0xA8]),
+        ("130", [0x45, 0x42, 0x21, 0x8F, 0xF0]),
+        ("1A6", [0x02, 0x00, 0x02, 0x00, 0x02, 0x00, 0x66, 0xF3]),
+        ("19E", [0x00, 0xE0, 0x13, 0xFC, 0xF0, 0x43, 0x00, 0x65]),
+        ("0C0", [0xF1, 0xFF]),
+        ("0D7", [0xC4, 0xFF]),
+        ("1D0", [0x94, 0xFF, 0x65, 0xCD, 0x5D, 0x37, 0xCD, 0xA8]),
+    ]
+
+@pytest.mark.parametrize("ignition_on", [True, False])
+def test_matches_baseline_arithmetic(can, ignition_on):
+    # Mais de 256 ciclos: cobre a volta dos contadores de 4, 8 e 16 bits
+    for _ in range(3000):
+        _cycle(can, ignition_on=ignition_on)
+    assert can.frames == _baseline_frames(3000, ignition_on=ignition_on)
+
+def test_ignition_variants_roll_independently(can):
+    modules.ignition.send_ignition(can, ignition_on=True)
+    COUNTERS.tick()
+    modules.ignition.send_ignition(can, ignition_on=False)
+    COUNTERS.tick()
+    modules.ignition.send_ignition(can, ignition_on=True)
+    assert [data[4] for _, data in can.frames] == [0xEF, 0xE2, 0xF0]
+
+def test_double_stamp_ticks_automatically():
+    engine = CounterEngine()
+    engine.register(0x100, CounterSpec(byte=0, initial=0x10))
+    frame = [0x00]
+    assert engine.stamp(0x100, frame) == [0x10]
+    assert engine.stamp(0x100, frame) == [0x11]
+    engine.tick()
+    assert engine.stamp(0x100, frame) == [0x12]
+
+def test_tick_only_advances_stamped_messages():
+    engine = CounterEngine()
+    engine.register(0x100, CounterSpec(byte=0))
+    engine.register(0x200, CounterSpec(byte=0))
+    engine.stamp(0x100, [0x00])
+    engine.tick()
+    assert engine.stamp(0x100, [0x00]) == [0x01]
+    assert engine.stamp(0x200, [0x00]) == [0x00]
+
+def test_sequence_does_not_change_state():
+    engine = CounterEngine()
+    engine.register(0x100, CounterSpec(byte=0, bits=4, or_mask=0xF0))
+    base = [0x00, 0xAA]
+    assert engine.sequence(0x100, base, 3) == [[0xF0, 0xAA], [0xF1, 0xAA], [0xF2, 0xAA]]
+    assert base == [0x00, 0xAA]
+    assert engine.stamp(0x100, list(base)) == [0xF0, 0xAA]
+
+    # Com um stamp pendente, a sequência começa no próximo valor
+    assert engine.sequence(0x100, base, 2) == [[0xF1, 0xAA], [0xF2, 0xAA]]
+    engine.tick()
+    assert engine.stamp(0x100, list(base)) == [0xF1, 0xAA]
+
+def test_sequence_matches_live_frames():
+    engine = CounterEngine()
+    engine.register(0x1A6, CounterSpec(byte=6, bits=16, step=315, initial=0x022B, or_mask=0xF000))
+    expected = engine.sequence(0x1A6, [0x00] * 8, 300)
+    live = []
+    for _ in range(300):
+        live.append(engine.stamp(0x1A6, [0x00] * 8))
+        engine.tick()
+    assert live == expected
+
+def test_freeze_and_release():
+    engine = CounterEngine()
+    engine.register(0x100, CounterSpec(byte=0, initial=5))
+    engine.freeze(0x100)
+    for _ in range(3):
+        assert engine.stamp(0x100, [0x00]) == [5]
+        engine.tick()
+    engine.freeze(0x100, frozen=False)
+    engine.stamp(0x100, [0x00])
+    engine.tick()
+    assert engine.stamp(0x100, [0x00]) == [6]
+
+def test_freeze_before_register():
+    engine = CounterEngine()
+    engine.freeze(0x100)
+    engine.register(0x100, CounterSpec(byte=0))
+    engine.stamp(0x100, [0x00])
+    engine.tick()
+    assert engine.stamp(0x100, [0x00]) == [0]
+
+def test_skip_wraps_with_step_and_mask():
+    engine = CounterEngine()
+    engine.register(0x100, CounterSpec(byte=0, bits=4, step=3, initial=0xE))
+    engine.skip(0x100, 2)
+    assert engine.stamp(0x100, [0x00]) == [(0xE + 6) & 0x0F]
+
+def test_reset_restores_initial_values():
+    engine = CounterEngine()
+    engine.register(0x100, CounterSpec(byte=0, initial=0x80))
+    engine.stamp(0x100, [0x00])
+    engine.tick()
+    engine.skip(0x100, 4)
+    engine.reset()
+    assert engine.stamp(0x100, [0x00]) == [0x80]
+
+def test_register_twice_is_rejected():
+    engine = CounterEngine()
+    engine.register(0x100, CounterSpec(byte=0))
+    with pytest.raises(ValueError):
+        engine.register(0x100, CounterSpec(byte=1))
+
+def test_crc8_check_value():
+    # Valor de verificação do SAE J1850 para "123456789"
+    assert crc8(b"123456789", poly=0x1D, init=0xFF, xor_out=0xFF) == 0x4B
+
+def test_checksum_spec_includes_id():
+    engine = CounterEngine()
+    checksum = ChecksumSpec(byte=0, include_id=True)
+    engine.register(0x1A6, CounterSpec(byte=1, bits=4), checksum=checksum)
+    frame = engine.stamp(0x1A6, [0x00, 0x00, 0x55])
+    assert frame[0] == crc8([0xA6, 0x01, 0x00, 0x55], poly=0x1D, init=0xFF)
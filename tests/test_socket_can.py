@@ -0,0 +1,74 @@
+"""
+Round-trip tests for socket_can.py over an in-process socketpair stand-in
+(AF_UNIX / SOCK_SEQPACKET keeps one can_frame per datagram, like CAN_RAW).
+"""
+
+import socket
+
+import pytest
+
+from socket_can import SocketCANInterface
+
+STANDARD = ("1A6", [0x01, 0x02, 0x03])
+EXTENDED = ("1ABCDE12", [0x11, 0x22, 0x33, 0x44, 0x55, 0x66, 0x77, 0x88])
+
+@pytest.fixture
+def pair():
+    a, b = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+    tx = SocketCANInterface(sockets={1: a})
+    rx = SocketCANInterface(sockets={2: b}, timeout=0.05)
+    yield tx, rx
+    tx.close()
+    rx.close()
+
+def _expected(channel, can_id, data):
+    return {"channel": channel, "can_id": can_id, "data": data}
+
+@pytest.mark.parametrize("can_id, data", [STANDARD, EXTENDED, ("7FF", []), ("000007FF", [0xFF])])
+def test_send_message_receive_message(pair, can_id, data):
+    tx, rx = pair
+    tx.send_message(1, can_id, data)
+    assert rx.receive_message() == _expected(2, can_id, data)
+
+def test_send_messages_receive_messages(pair):
+    tx, rx = pair
+    batch = [(1, STANDARD[0], STANDARD[1]), (1, EXTENDED[0], EXTENDED[1])] * 3
+    assert tx.send_messages(batch) == len(batch)
+    assert rx.receive_messages() == [_expected(2, can_id, data) for _, can_id, data in batch]
+
+def test_send_raw_receive_messages(pair):
+    tx, rx = pair
+    payload = tx.encode_message(1, *STANDARD) + tx.encode_message(1, *EXTENDED)
+    assert tx.send_raw(payload) == len(payload)
+    assert rx.receive_messages() == [_expected(2, *STANDARD), _expected(2, *EXTENDED)]
+
+def test_eleven_and_29_bit_ids_stay_distinct(pair):
+    tx, rx = pair
+    tx.send_message(1, "1A6", [0xAA])
+    tx.send_message(1, "000001A6", [0xBB])
+    assert [m["can_id"] for m in rx.receive_messages()] == ["1A6", "000001A6"]
+
+def test_receive_messages_respects_max_frames(pair):
+    tx, rx = pair
+    tx.send_messages([(1, STANDARD[0], [n]) for n in range(5)])
+    assert [m["data"] for m in rx.receive_messages(max_frames=3)] == [[0], [1], [2]]
+    assert [m["data"] for m in rx.receive_messages()] == [[3], [4]]
+
+def test_dlc_above_8_is_rejected(pair, capsys):
+    tx, rx = pair
+    with pytest.raises(ValueError):
+        tx.encode_message(1, "1A6", list(range(9)))
+
+    tx.send_message(1, "1A6", list(range(9)))
+    assert "[ERRO]" in capsys.readouterr().out
+    assert rx.receive_messages() == []
+
+def test_forced_dlc_above_8_decodes_8_bytes(pair):
+    tx, rx = pair
+    tx.send_raw(tx.encode_message(1, *EXTENDED, dlc=15))
+    assert rx.receive_messages() == [_expected(2, *EXTENDED)]
+
+def test_empty_reads(pair):
+    _, rx = pair
+    assert rx.receive_messages() == []
+    assert rx.receive_message() is None
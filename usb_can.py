@@ -14,7 +14,10 @@ Description:
     - Connect to a USB serial port
     - Configure CAN channels with specific baudrates
     - Send standard and extended CAN frames
+    - Pre-encode frames and write them in bulk (encode_message / send_raw);
+      the encoder is also available as the module-level encode_ascii
     - Receive and decode incoming CAN messages (ignores timestamp suffix if present)
+    - Read every pending line at once without blocking (read_lines)
 
     This abstraction simplifies the process of sending and receiving CAN messages 
     to vehicle components, such as BMW instrument clusters, for testing, simulation, 
@@ -33,9 +36,46 @@ Usage Example:
     if message:
         print(message)
 """
-import serial
+try:
+    import serial
+except ImportError:     # encode_ascii continua disponível sem pyserial
+    serial = None
 import time
 
+def encode_ascii(channel, can_id, data, dlc=None):
+    """
+    Monta o comando ASCII de uma mensagem CAN, pronto para escrita na serial.
+
+    Não depende da porta serial (nem do pyserial).
+
+    Args:
+        channel (int): Canal CAN (1 ou 2).
+        can_id (str): ID CAN em hexadecimal (ex: '26E' ou '1ABCDE12').
+        data (list[int]): Lista com até 8 bytes (0-255).
+        dlc (int | None): Força um DLC diferente do tamanho dos dados
+            (usado para injeção de falhas).
+
+    Retorna:
+        bytes: Comando codificado.
+    """
+    if not (1 <= channel <= 2):
+        raise ValueError("Canal deve ser 1 ou 2.")
+
+    if len(data) > 8:
+        raise ValueError("Mensagem CAN deve ter até 8 bytes.")
+
+    can_id_str = can_id.upper()
+
+    # Define padrão ou estendido
+    extended = len(can_id_str) > 3
+    cmd_type = 'T' if extended else 't'
+
+    if dlc is None:
+        dlc = len(data)
+    data_str = bytes(data).hex().upper()
+
+    return f"{cmd_type}{channel}{can_id_str}{dlc:X}{data_str}\r".encode()
+
 class CANInterface:
     BAUD_RATE_COMMANDS = {
         10:  "1",
@@ -59,11 +99,14 @@ class CANInterface:
             timeout (float): Timeout da porta serial.
         """
         try:
+            if serial is None:
+                raise ImportError("pyserial não instalado")
             self.ser = serial.Serial(port, serial_baudrate, timeout=timeout)
             print(f"[OK] Conectado à porta {port}")
         except Exception as e:
             print(f"[ERRO] Não foi possível abrir a porta {port}: {e}")
             self.ser = None
+        self._rx_buffer = b""
     #---------------------------------------------------------------------------------------------------------
     def is_connected(self):
         return self.ser is not None and self.ser.is_open
@@ -103,6 +146,30 @@ class CANInterface:
         except Exception as e:
             print(f"[ERRO] Falha ao configurar CAN{channel}: {e}")
     #---------------------------------------------------------------------------------------------------------
+    def encode_message(self, channel, can_id, data, dlc=None):
+        """
+        Monta o comando ASCII de uma mensagem CAN (ver encode_ascii).
+        """
+        return encode_ascii(channel, can_id, data, dlc)
+    #---------------------------------------------------------------------------------------------------------
+    def send_raw(self, payload):
+        """
+        Escreve comandos já codificados (um ou vários frames concatenados).
+
+        Args:
+            payload (bytes): Saída de encode_message, possivelmente concatenada.
+
+        Retorna:
+            int: Bytes escritos (0 em caso de falha).
+        """
+        try:
+            if not self.is_connected():
+                raise Exception("Porta serial não conectada.")
+            return self.ser.write(payload) or 0
+        except Exception as e:
+            print(f"[ERRO] Falha ao enviar mensagem CAN: {e}")
+            return 0
+    #---------------------------------------------------------------------------------------------------------
     def send_message(self, channel, can_id, data):
         """
         Envia uma mensagem CAN no canal especificado.
@@ -116,23 +183,8 @@ class CANInterface:
             if not self.is_connected():
                 raise Exception("Porta serial não conectada.")
 
-            if not (1 <= channel <= 2):
-                raise ValueError("Canal deve ser 1 ou 2.")
-
-            if len(data) > 8:
-                raise ValueError("Mensagem CAN deve ter até 8 bytes.")
-
-            can_id_str = can_id.upper()
-
-            # Define padrão ou estendido
-            extended = len(can_id_str) > 3
-            cmd_type = 'T' if extended else 't'
-
-            dlc = len(data)
-            data_str = ''.join(f"{byte:02X}" for byte in data)
-
-            cmd = f"{cmd_type}{channel}{can_id_str}{dlc}{data_str}\r"
-            self.ser.write(cmd.encode())
+            cmd = self.encode_message(channel, can_id, data)
+            self.ser.write(cmd)
             # print(f"Sent: {cmd.strip()}")
 
         except Exception as e:
@@ -154,27 +206,68 @@ class CANInterface:
             if not line:
                 return None
 
-            # Verifica tipo da mensagem
-            if line.startswith("t") or line.startswith("T"):
-                extended = line[0] == "T"
-                channel = int(line[1])
-                id_len = 8 if extended else 3
-                can_id = line[2:2 + id_len]
-                dlc_index = 2 + id_len
-                dlc = int(line[dlc_index], 16)
-                data_start = dlc_index + 1
-                data_end = data_start + dlc * 2
-                data_raw = line[data_start:data_end]
-
-                data = [int(data_raw[i:i+2], 16) for i in range(0, len(data_raw), 2)]
-
-                return {
-                    "channel": channel,
-                    "can_id": can_id,
-                    "data": data
-                }
-
-            return None  # Ignora linhas que não são CAN
+            return self.parse_line(line)
+        except Exception as e:
+            print(f"[ERRO] Falha ao receber mensagem CAN: {e}")
+            return None
+    #---------------------------------------------------------------------------------------------------------
+    @staticmethod
+    def parse_line(line):
+        """
+        Decodifica uma linha ASCII 't'/'T' recebida do adaptador.
+
+        Args:
+            line (str): Linha sem o terminador.
+
+        Retorna:
+            dict | None: Um dicionário com 'channel', 'can_id', 'data', ou None se não for CAN.
+        """
+        # Verifica tipo da mensagem
+        if line.startswith("t") or line.startswith("T"):
+            extended = line[0] == "T"
+            channel = int(line[1])
+            id_len = 8 if extended else 3
+            can_id = line[2:2 + id_len]
+            dlc_index = 2 + id_len
+            dlc = int(line[dlc_index], 16)
+            data_start = dlc_index + 1
+            data_end = data_start + dlc * 2
+            data_raw = line[data_start:data_end]
+
+            data = [int(data_raw[i:i+2], 16) for i in range(0, len(data_raw), 2)]
+
+            return {
+                "channel": channel,
+                "can_id": can_id,
+                "data": data
+            }
+
+        return None  # Ignora linhas que não são CAN
+    #---------------------------------------------------------------------------------------------------------
+    def read_lines(self):
+        """
+        Lê, sem bloquear, todas as linhas completas já recebidas pela serial.
+
+        Uma linha incompleta fica guardada até a próxima chamada.
+
+        Retorna:
+            list[bytes]: Linhas recebidas, sem o terminador.
+        """
+        try:
+            if not self.is_connected():
+                raise Exception("Serial port not connected.")
+
+            waiting = self.ser.in_waiting
+            if not waiting:
+                return []
+
+            chunks = (self._rx_buffer + self.ser.read(waiting)).splitlines(keepends=True)
+            if chunks and not chunks[-1].endswith((b"\r", b"\n")):
+                self._rx_buffer = chunks.pop()
+            else:
+                self._rx_buffer = b""
+
+            return [line for line in (chunk.strip() for chunk in chunks) if line]
         except Exception as e:
             print(f"[ERRO] Falha ao receber mensagem CAN: {e}")
-            return None
\ No newline at end of file
+            return []